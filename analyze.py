@@ -14,23 +14,21 @@
 # the License.
 
 import argparse
+import copy
 import logging
 import os
 import textwrap
 import json
-import glob
 import subprocess
 import shutil
 import sys
-import tempfile
 
-from typing import Iterable, Set, Any, Optional, Tuple, Iterator, cast
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Any, Optional, Tuple
 from datetime import datetime
-from io import StringIO
 
+import numpy as np
 import pandas as pd
-import pytz
-import altair as alt  # type: ignore
 
 
 """
@@ -48,20 +46,21 @@ logging.basicConfig(
     datefmt="%y%m%d-%H:%M:%S",
 )
 
-# Also see https://github.com/jgehrcke/github-repo-stats/issues/52
-alt.data_transformers.disable_max_rows()
-
 NOW = datetime.utcnow()
 TODAY = NOW.strftime("%Y-%m-%d")
+NOW_TEXT = NOW.strftime("%Y-%m-%d %H:%M UTC")
 OUTDIR: Optional[str] = None
+SNAPSHOT_DIR_FILENAMES: Optional[list[str]] = None
 
 # https://stackoverflow.com/a/68855129/145400
 # ARGS: Optional[argparse.Namespace] = None
 ARGS: Any = None
 
-# Individual code sections are supposed to add to this in-memory Markdown
-# document as they desire.
-MD_REPORT = StringIO()
+# Individual code sections are supposed to add to this Markdown document as
+# they desire. This is a (buffered) file object, opened in `main()` after the
+# output directory has been created: the document is streamed to disk as it
+# is being generated, instead of being accumulated in memory first.
+MD_REPORT: Any = None
 JS_FOOTER_LINES: list[str] = []
 
 # https://github.com/vega/vega-embed#options -- use SVG renderer so that PDF
@@ -78,11 +77,113 @@ DATETIME_AXIS_PROPERTIES = {
     "axis": {"labelAngle": DATE_LABEL_ANGLE},
 }
 
+# Chart panel properties and symlog y axis ticks are the same for every chart
+# of a kind: define them once here instead of re-building them per chart.
+PANEL_PROPERTIES = {"height": 300, "width": "container", "padding": 10}
+VIEWS_CLONES_PANEL_PROPERTIES = {"height": 200, "width": "container", "padding": 10}
+SYMLOG_AXIS_VALUES = [1, 10, 50, 100, 500, 1000, 5000, 10000]
+
+# Views/clones counts are small non-negative integers: 32 bit are plenty, and
+# halve the memory moved around when concatenating and aggregating compared
+# to the int64/float64 default. Fragments may contain empty values (NaN), and
+# values like `2.0`: these are converted to int32 after reading (after
+# replacing NaN with 0).
+VIEWS_CLONES_METRIC_COLUMNS = [
+    "clones_total",
+    "clones_unique",
+    "views_total",
+    "views_unique",
+]
+
+# Column names as found in top referrer/path snapshot CSV files, mapped to the
+# names used in this program.
+TOP_X_SNAPSHOTS_COLUMN_RENAMES = {
+    "referrers": "referrer",
+    "url_path": "path",
+    "count_unique": "views_unique",
+    "count_total": "views_total",
+}
+
+# Entity name (and title) columns in top referrer/path snapshot CSV files,
+# under their original and current names. Always read these as strings: type
+# inference would otherwise for example yield an integer column for a snapshot
+# file that only contains a referrer or path consisting of digits (and then
+# the tables of all snapshot files could not be concatenated).
+TOP_X_SNAPSHOTS_STRING_COLUMNS = ("referrers", "referrer", "url_path", "path", "title")
+
+# The four views/clones charts show data from the same dataframe. Emit that
+# data only once into the HTML document (as a JS variable), and let each chart
+# spec refer to it by name (instead of inlining a copy of the data into each
+# chart spec). The data is emitted in CSV format (much more compact than JSON
+# records which repeat all column names in each row), parsed by Vega in the
+# browser according to this format specification.
+VIEWS_CLONES_DATASET_NAME = "views_clones"
+VIEWS_CLONES_DATA_FORMAT = {
+    "type": "csv",
+    "parse": {"time": "date", **{c: "number" for c in VIEWS_CLONES_METRIC_COLUMNS}},
+}
+
+# The main style block of the HTML document, for either target; see
+# `gen_main_style_block()`. Dedented once, at import time.
+MAIN_STYLE_BLOCKS = {
+    "html_browser_view": textwrap.dedent(
+        """
+        <style>
+            body {
+                box-sizing: border-box;
+                min-width: 200px;
+                max-width: 980px;
+                margin: 0 auto;
+                padding: 5px;
+            }
+
+            div.full-width-chart {
+                width: 100%;
+            }
+        </style>
+    """
+    ),
+    "html_pdf_view": textwrap.dedent(
+        """
+        <style>
+            @media print {
+              .pagebreak-for-print {
+                  clear: both;
+                  page-break-after: always;
+               }
+            }
+
+            body {
+                margin: 0;
+                padding: 0;
+            }
+
+            div.full-width-chart {
+                width: 100%;
+            }
+        </style>
+    """
+    ),
+}
+
 
 def main() -> None:
+    global MD_REPORT
     parse_args()
     configure_altair()
 
+    # Do not translate newlines (`newline=""`): the document is written as-is.
+    # Stream to a temporary file, which is renamed into place only when the
+    # document is complete (see `finalize_and_render_report()`): an error exit
+    # along the way must not leave a truncated report.md behind.
+    MD_REPORT = open(
+        get_md_report_filepath() + ".tmp",
+        "w",
+        encoding="utf-8",
+        newline="",
+        buffering=1 << 20,
+    )
+
     df_stargazers = read_stars_over_time_from_csv()
     df_forks = read_forks_over_time_from_csv()
 
@@ -177,6 +278,12 @@ def gen_date_axis_lim(dfs: Iterable[pd.DataFrame]) -> Tuple[str, str]:
 
 
 def configure_altair():
+    # Altair is a heavy import (schema loading). Import it only where charts
+    # are built, so that e.g. `analyze.py --help` does not pay for it.
+    import altair as alt  # type: ignore
+
+    # Also see https://github.com/jgehrcke/github-repo-stats/issues/52
+    alt.data_transformers.disable_max_rows()
     # https://github.com/carbonplan/styles
     alt.themes.enable("carbonplan_light")
     # https://github.com/altair-viz/altair/issues/673#issuecomment-566567828
@@ -184,33 +291,24 @@ def configure_altair():
 
 
 def gen_report_footer():
-    js_footer = "\n".join(JS_FOOTER_LINES)
-    MD_REPORT.write(
-        textwrap.dedent(
-            f"""
-
-    <script type="text/javascript">
-    {js_footer}
-    </script>
-
-    """
-        ).strip()
-    )
+    # The JS lines can be large (they contain the chart data). Write them one
+    # by one instead of first assembling (and dedenting) one big string.
+    MD_REPORT.write('<script type="text/javascript">\n')
+    for line in JS_FOOTER_LINES:
+        MD_REPORT.write(line)
+        MD_REPORT.write("\n")
+    MD_REPORT.write("</script>")
 
 
 def gen_report_preamble():
-    now_text = NOW.strftime("%Y-%m-%d %H:%M UTC")
     attr_link = (
         "[jgehrcke/github-repo-stats](https://github.com/jgehrcke/github-repo-stats)"
     )
+    # Two lines of pandoc title block: write them as they are (no need for
+    # dedenting/stripping a template).
     MD_REPORT.write(
-        textwrap.dedent(
-            f"""
-    % Statistics for {ARGS.repospec}
-    % Generated for [{ARGS.repospec}](https://github.com/{ARGS.repospec}) with {attr_link} at {now_text}.
-
-    """
-        ).strip()
+        f"% Statistics for {ARGS.repospec}\n"
+        f"% Generated for [{ARGS.repospec}](https://github.com/{ARGS.repospec}) with {attr_link} at {NOW_TEXT}."
     )
 
 
@@ -221,37 +319,74 @@ def report_pdf_pagebreak():
     MD_REPORT.write('\n\n<div class="pagebreak-for-print"> </div>\n\n')
 
 
+def _link_or_copy(src, dst):
+    # Create a hard link instead of copying file contents. Do not use symbolic
+    # links: the output directory is typically published (e.g. committed to
+    # a git branch) on its own. Fall back to copying (e.g. when source and
+    # destination are on different file systems).
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def get_md_report_filepath():
+    return os.path.join(OUTDIR, f"{ARGS.outfile_prefix}report.md")
+
+
+def discard_incomplete_md_report():
+    if MD_REPORT is None or MD_REPORT.closed:
+        return
+    MD_REPORT.close()
+    log.info("remove incomplete Markdown report: %s", MD_REPORT.name)
+    os.unlink(MD_REPORT.name)
+
+
 def finalize_and_render_report():
-    md_report_filepath = os.path.join(OUTDIR, f"{ARGS.outfile_prefix}report.md")
+    md_report_filepath = get_md_report_filepath()
     log.info("Write generated Markdown report to: %s", md_report_filepath)
-    with open(md_report_filepath, "wb") as f:
-        f.write(MD_REPORT.getvalue().encode("utf-8"))
-
-    log.info("Copy resources directory into output directory")
-    shutil.copytree(ARGS.resources_directory, os.path.join(OUTDIR, "resources"))
+    # Flush the remainder of the document to disk, then move it into place.
+    MD_REPORT.close()
+    os.rename(MD_REPORT.name, md_report_filepath)
 
     # As of the time of writing, the `resources` source directory contains a
     # CSS file which must be part of the output -- and a template.html file
-    # which is not needed in the output. Simply remove that again.
-    os.unlink(os.path.join(OUTDIR, "resources", "template.html"))
-
-    # Generate HTML doc for browser view
-    html_template_filepath = gen_pandoc_html_template("html_browser_view")
-    run_pandoc(
-        md_report_filepath,
-        html_template_filepath,
-        html_output_filepath=os.path.splitext(md_report_filepath)[0] + ".html",
+    # which is not needed in the output. Do not copy that.
+    log.info("Copy resources directory into output directory")
+    shutil.copytree(
+        ARGS.resources_directory,
+        os.path.join(OUTDIR, "resources"),
+        ignore=shutil.ignore_patterns("template.html"),
+        copy_function=_link_or_copy,
     )
-    os.unlink(html_template_filepath)
 
-    # Generate HTML doc that will be used for rendering a PDF doc.
-    html_template_filepath = gen_pandoc_html_template("html_pdf_view")
-    run_pandoc(
+    # Generate the HTML doc for browser view, and the HTML doc that will be
+    # used for rendering a PDF doc. These only differ in the main style block
+    # (see `gen_main_style_block()`). Run pandoc only once: the template's
+    # `MAIN_STYLE_BLOCK` placeholder is passed through as-is by pandoc, and
+    # then replaced in the pandoc output, once for each of the two targets.
+    md_report_basepath = os.path.splitext(md_report_filepath)[0]
+    html_browser_filepath = md_report_basepath + ".html"
+    if not run_pandoc(
         md_report_filepath,
-        html_template_filepath,
-        html_output_filepath=os.path.splitext(md_report_filepath)[0] + "_for_pdf.html",
-    )
-    os.unlink(html_template_filepath)
+        os.path.join(ARGS.resources_directory, "template.html"),
+        html_output_filepath=html_browser_filepath,
+    ):
+        return
+
+    with open(html_browser_filepath, "r", encoding="utf-8", newline="") as f:
+        html_text = f.read()
+
+    for target, html_output_filepath in (
+        ("html_pdf_view", md_report_basepath + "_for_pdf.html"),
+        ("html_browser_view", html_browser_filepath),
+    ):
+        log.info("write %s", html_output_filepath)
+        with open(html_output_filepath, "w", encoding="utf-8", newline="") as f:
+            f.write(
+                html_text.replace("MAIN_STYLE_BLOCK", gen_main_style_block(target), 1)
+            )
 
 
 def run_pandoc(md_report_filepath, html_template_filepath, html_output_filepath):
@@ -276,76 +411,20 @@ def run_pandoc(md_report_filepath, html_template_filepath, html_output_filepath)
     else:
         log.info("Pandoc terminated indicating error: exit code %s", p.returncode)
 
+    # Allow for pandoc to be replaced by e.g. `true` (for testing): only
+    # report success if the output file has been created.
+    return p.returncode == 0 and os.path.exists(html_output_filepath)
 
-def gen_pandoc_html_template(target):
+
+def gen_main_style_block(target):
     # Generally, a lot could be done with the same pandoc HTML template and
     # using CSS @media print. Took the more flexible and generic approach
     # here, though, where we're able to generate two completely different
-    # HTML templates, if needed.
+    # style blocks, if needed.
 
     assert target in ["html_browser_view", "html_pdf_view"]
 
-    if target == "html_browser_view":
-        main_style_block = textwrap.dedent(
-            """
-            <style>
-                body {
-                    box-sizing: border-box;
-                    min-width: 200px;
-                    max-width: 980px;
-                    margin: 0 auto;
-                    padding: 5px;
-                }
-
-                div.full-width-chart {
-                    width: 100%;
-                }
-            </style>
-        """
-        )
-
-    if target == "html_pdf_view":
-        main_style_block = textwrap.dedent(
-            """
-            <style>
-                @media print {
-                  .pagebreak-for-print {
-                      clear: both;
-                      page-break-after: always;
-                   }
-                }
-
-                body {
-                    margin: 0;
-                    padding: 0;
-                }
-
-                div.full-width-chart {
-                    width: 100%;
-                }
-            </style>
-        """
-        )
-
-    with open(os.path.join(ARGS.resources_directory, "template.html"), "rb") as f:
-        tpl_text = f.read().decode("utf-8")
-
-    # Do simple string replacement instead of picking one of the established
-    # templating methods: the pandoc template language uses dollar signs, and
-    # the CSS in the file uses curly braces.
-    rendered_pandoc_template = tpl_text.replace("MAIN_STYLE_BLOCK", main_style_block)
-
-    # Do a pragmatic close/unlink effort at end of program. It's not so bad in
-    # this case when either does not happen. Note that if the temp file path
-    # has no extension then pandoc seems to append `.html` before opening the
-    # file -- which the fails with ENOENT.
-    tmpf = tempfile.NamedTemporaryFile(delete=False, suffix=".html")
-    log.info("creating %s", tmpf.name)
-    tmpf.write(rendered_pandoc_template.encode("utf-8"))
-    tmpf.close()
-
-    # Return path to pandoc template.
-    return tmpf.name
+    return MAIN_STYLE_BLOCKS[target]
 
 
 def top_x_snapshots_rename_columns(df):
@@ -353,127 +432,204 @@ def top_x_snapshots_rename_columns(df):
 
     # As always, naming is hard. Names get clearer over time. Work with data
     # files that have non-ideal names. Semantically, there is a column name
-    # oversight -- plural vs. singular. Maybe fix in CSVs? Either one of both
-    # renames or both renames are OK to fail.
-    try:
-        df.rename(columns={"referrers": "referrer"}, inplace=True)
-    except ValueError:
-        pass
+    # oversight -- plural vs. singular. Maybe fix in CSVs? Any of these
+    # renames may not apply (column not present): that's OK, rename() ignores
+    # those. Do all renames in one go (builds the new column index only once).
+    df.rename(columns=TOP_X_SNAPSHOTS_COLUMN_RENAMES, inplace=True)
 
-    try:
-        df.rename(columns={"url_path": "path"}, inplace=True)
-    except ValueError:
-        pass
 
-    try:
-        df.rename(columns={"count_unique": "views_unique"}, inplace=True)
-    except ValueError:
-        pass
+def _get_snapshot_times_from_paths(paths, basename_suffix) -> pd.DatetimeIndex:
+    # Expect each filename (basename) to have a prefix of format
+    # %Y-%m-%d_%H%M%S encoding the snapshot time (in UTC). Isolate that for
+    # each path, return the snapshot times as tz-aware `pd.DatetimeIndex`
+    # (same order as `paths`).
+    # This is a fixed-width layout: rearrange it into ISO 8601 notation by
+    # slicing, and have NumPy parse all timestamps in one go (that is much
+    # faster than strptime() or constructing a datetime object per path).
+    iso_strings = []
+    for p in paths:
+        s = os.path.basename(p).split(basename_suffix)[0]
+        iso_strings.append(f"{s[0:10]}T{s[11:13]}:{s[13:15]}:{s[15:17]}")
+
+    times = pd.DatetimeIndex(np.array(iso_strings, dtype="datetime64[ns]"))
+    return times.tz_localize("UTC")
+
+
+def _same_columns(columns: list[str], expected: list[str]) -> bool:
+    # Files written by fetch.py have the same columns in the same order, i.e.
+    # the cheap list comparison is expected to succeed. Only fall back to an
+    # order-insensitive comparison if it does not.
+    return columns == expected or set(columns) == set(expected)
+
+
+def _check_columns_consistent(path_columns_pairs) -> None:
+    # All CSV files of a kind are expected to have the same set of columns as
+    # the first one. Check that once, after all files have been read.
+    if not path_columns_pairs:
+        return
 
-    try:
-        df.rename(columns={"count_total": "views_total"}, inplace=True)
-    except ValueError:
-        pass
+    columns_first_file = path_columns_pairs[0][1]
+    for p, columns in path_columns_pairs[1:]:
+        if not _same_columns(columns, columns_first_file):
+            log.error("columns in first CSV file: %s", columns_first_file)
+            log.error("columns in %s: %s", p, columns)
+            log.error("inconsistent set of column names across CSV files")
+            sys.exit(1)
 
 
-def _get_snapshot_time_from_path(p, basename_suffix):
-    # Expect each filename (basename) to have a prefix of format
-    # %Y-%m-%d_%H%M%S encoding the snapshot time (in UTC). Isolate that as
-    # tz-aware datetime object, return.
-    basename_prefix = os.path.basename(p).split(basename_suffix)[0]
-    t = pytz.timezone("UTC").localize(
-        datetime.strptime(basename_prefix, "%Y-%m-%d_%H%M%S")
+def _read_csv_files_concurrently(read_func, csvpaths):
+    # Reading each file is I/O and CSV parsing (in C code, not holding the GIL)
+    # -- read files concurrently. `read_func(p)` is expected to return a
+    # `(p, table)` tuple. Return a list of these, in the order of
+    # `csvpaths`. Scale the number of threads with the number of CPUs (as
+    # ThreadPoolExecutor does by default), but do not start more threads than
+    # there are files.
+    if not csvpaths:
+        return []
+
+    max_workers = min(32, (os.cpu_count() or 1) + 4, len(csvpaths))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_func, csvpaths))
+
+
+def _read_top_x_snapshot(p):
+    import pyarrow as pa  # type: ignore
+    import pyarrow.csv as pacsv  # type: ignore
+
+    log.debug("attempt to parse %s", p)
+    # Parse into an Arrow table (no pandas DataFrame construction per file).
+    # Files are read concurrently already: do not spawn more threads per file.
+    # Column types given for columns not present in the file are ignored.
+    table = pacsv.read_csv(
+        p,
+        read_options=pacsv.ReadOptions(use_threads=False),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in TOP_X_SNAPSHOTS_STRING_COLUMNS}
+        ),
     )
-    log.debug("parsed timestamp from path: %s", t)
-    return t
+    return p, table
 
 
-def _get_snapshot_dfs(csvpaths, basename_suffix):
-    snapshot_dfs = []
-    column_names_seen = set()
+def _read_top_x_snapshots(csvpaths, basename_suffix) -> Optional[pd.DataFrame]:
+    # Read all snapshot files of a kind, concatenate them, and return the
+    # result as a single DataFrame (or None if there are no snapshot files).
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
 
     log.info(f"about to deserialize {len(csvpaths)} snapshot CSV files")
 
-    for p in csvpaths:
-        log.debug("attempt to parse %s", p)
-        snapshot_time = _get_snapshot_time_from_path(p, basename_suffix)
-        df = pd.read_csv(p)
+    snapshots = _read_csv_files_concurrently(_read_top_x_snapshot, csvpaths)
+    _check_columns_consistent([(p, t.column_names) for p, t in snapshots])
+    if not snapshots:
+        return None
+
+    # Concatenate in Arrow (cheap, no copy of the column data), and convert
+    # to pandas once, for all snapshots. The per-snapshot row index carries
+    # no meaning (the snapshot time is in the `time` column). `promote`:
+    # unify column order, and column types of files without data rows (whose
+    # columns are inferred to be of null type).
+    table = pa.concat_tables([t for _, t in snapshots], promote=True)
+
+    # Store string columns (entity names, i.e. referrers/paths) as categorical
+    # columns: there are only few distinct names, repeated across snapshots.
+    # That saves memory, and makes grouping by/filtering for entity names work
+    # on integer codes.
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type):
+            table = table.set_column(
+                i, field.name, pc.dictionary_encode(table.column(i))
+            )
 
-        # mutate column names in-place.
-        top_x_snapshots_rename_columns(df)
+    # Add new column: `time`, with the same value for all rows originating
+    # from the same file: the snapshot time. This is the only place where the
+    # snapshot time is recorded (no need for a separate metadata prop). Build
+    # that column in one go for all snapshots (instead of one small array per
+    # file).
+    snapshot_times = _get_snapshot_times_from_paths(
+        [p for p, _ in snapshots], basename_suffix
+    )
+    table = table.append_column(
+        "time",
+        pa.array(
+            np.repeat(snapshot_times.asi8, [t.num_rows for _, t in snapshots]),
+            type=pa.timestamp("ns", tz="UTC"),
+        ),
+    )
+    snapshots.clear()
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
 
-        # attach snapshot time as meta data prop to df
-        df.attrs["snapshot_time"] = snapshot_time
+    # mutate column names in-place.
+    top_x_snapshots_rename_columns(df)
+    return df
 
-        # Add new column to each dataframe: `time`, with the same value for
-        # every row: the snapshot time.
-        df["time"] = snapshot_time
 
-        if column_names_seen and set(df.columns) != column_names_seen:
-            log.error("columns seen so far: %s", column_names_seen)
-            log.error("columns in %s: %s", p, df.columns)
-            log.error("inconsistent set of column names across CSV files")
-            sys.exit(1)
+def _sort_by_index(df: pd.DataFrame) -> pd.DataFrame:
+    # Time series read from disk are typically sorted already: detect that
+    # (cheap, linear scan) and skip sorting. Otherwise sort via a stable
+    # argsort of the index plus a single take() -- that avoids the overhead
+    # and the large intermediate allocations of sort_index(). The stable sort
+    # (timsort) is close to linear for input consisting of few sorted runs
+    # (e.g. concatenated time series fragments).
+    if df.index.is_monotonic_increasing:
+        return df
+    return df.take(df.index.argsort(kind="mergesort"))
 
-        column_names_seen.update(df.columns)
-        snapshot_dfs.append(df)
-
-    return snapshot_dfs
-
-
-def _build_entity_dfs(dfa, entity_type, unique_entity_names):
-    cmn_ename_prefix = os.path.commonprefix(list(unique_entity_names))
-    log.info("_build_entity_dfs. cmn_ename_prefix: %s", cmn_ename_prefix)
-    log.info("dfa:\n%s", dfa)
-
-    entity_dfs = {}
-    for ename in unique_entity_names:
-        # Do a subselection
-        edf = dfa[dfa[entity_type] == ename]
-        # Now use datetime column as index
-        newindex = edf["time"]
-        edf = edf.drop(columns=["time"])
-
-        edf.index = newindex
-        edf = edf.sort_index()
-
-        # Do entity name processing
-        log.debug("ename before transformation: %s", ename)
-        if entity_type == "path":
-            entity_name_transformed = ename[len(cmn_ename_prefix) :]
-            # The root path (e.g., `owner/repo`) is now an empty string. That's
-            # not so cool, make the root be represented by a single slash.
-            if entity_name_transformed == "":
-                entity_name_transformed = "/"
-            edf.rename(columns={ename: entity_name_transformed}, inplace=True)
-            # Also change `ename` from here on, so that `entity_dfs` is built
-            # up using the transformed ename.
-            ename = entity_name_transformed
-
-        # Make it so that there is at most one data point per day, in case
-        # individual snapshots were taken with higher frequency.
-        n_hour_bins = 24
-        log.debug("len(edf): %s", len(edf))
-        log.debug("downsample entity DF into %s-hour bins", n_hour_bins)
-        # Resample the DF into N-hour bins. Take max() for each group. Do
-        # `dropna()` on the resampler to remove all up-sampled data points (in
-        # case snapshots were taken at much lower frequency). Default behavior
-        # of the resampling operation is to note the value for each bin at the
-        # left edge of the bin, and to have the bin be closed on the left edge
-        # (right edge of the bin belongs to next bin).
-        edf = edf.resample(f"{n_hour_bins}h").max().dropna()
-        # log.debug("len(edf): %s", len(edf))
-
-        # print(edf)
-        entity_dfs[ename] = edf
-        log.info(f"created dataframe for {entity_type}: {ename} -- len: {len(edf)}")
-
-    return entity_dfs
-
-
-def _glob_csvpaths(basename_suffix):
+
+def _shorten_path_names(dfa):
+    # Do entity name processing: strip the common prefix (e.g. `/owner/repo`)
+    # from all path names. The `path` column is categorical: process each
+    # distinct path name once (instead of each row).
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+
+    names = dfa["path"].cat.categories
+    cmn_ename_prefix = os.path.commonprefix(list(names))
+    log.info("_shorten_path_names. cmn_ename_prefix: %s", cmn_ename_prefix)
+    short_names = pc.utf8_slice_codeunits(
+        pa.array(names, type=pa.string()), start=len(cmn_ename_prefix)
+    )
+    # The root path (e.g., `owner/repo`) is now an empty string. That's not so
+    # cool, make the root be represented by a single slash.
+    short_names = pc.if_else(pc.equal(short_names, ""), "/", short_names).to_pylist()
+
+    if len(set(short_names)) == len(short_names):
+        dfa["path"] = dfa["path"].cat.rename_categories(short_names)
+    else:
+        # Two path names map to the same short name (e.g. `/owner/repo` and
+        # `/owner/repo/`): treat these as the same entity from here on.
+        dfa["path"] = dfa["path"].map(dict(zip(names, short_names))).astype("category")
+
+
+def _list_snapshot_dir():
+    # List the snapshot directory once (it is looked at for multiple types of
+    # snapshot files), and keep the result around. Like glob(), ignore hidden
+    # files, and tolerate the directory not existing.
+    global SNAPSHOT_DIR_FILENAMES
+    if SNAPSHOT_DIR_FILENAMES is None:
+        try:
+            with os.scandir(ARGS.snapshotdir) as it:
+                SNAPSHOT_DIR_FILENAMES = sorted(
+                    e.name for e in it if not e.name.startswith(".") and e.is_file()
+                )
+        except FileNotFoundError:
+            log.info("snapshot directory does not exist: %s", ARGS.snapshotdir)
+            SNAPSHOT_DIR_FILENAMES = []
+    return SNAPSHOT_DIR_FILENAMES
+
+
+def _find_csvpaths(basename_suffix):
     basename_pattern = f"*{basename_suffix}"
-    csvpaths = glob.glob(os.path.join(ARGS.snapshotdir, basename_pattern))
+    # Simple suffix match instead of fnmatch-based glob() for each type of
+    # snapshot file. The file names are sorted by name, i.e. by snapshot time
+    # (the file name prefix). Data concatenated in this order is mostly sorted
+    # by time already (fragments overlap only at their boundaries), which makes
+    # sorting it cheap.
+    csvpaths = [
+        os.path.join(ARGS.snapshotdir, n)
+        for n in _list_snapshot_dir()
+        if n.endswith(basename_suffix)
+    ]
     log.info(
         "number of CSV files discovered for %s: %s",
         basename_pattern,
@@ -483,39 +639,25 @@ def _glob_csvpaths(basename_suffix):
 
 
 def analyse_top_x_snapshots(entity_type, date_axis_lim):
+    import altair as alt  # type: ignore
+
     assert entity_type in ["referrer", "path"]
 
     heading = "Top referrers" if entity_type == "referrer" else "Top paths"
 
     log.info("read 'top %s' snapshots (CSV docs)", entity_type)
     basename_suffix = f"_top_{entity_type}s_snapshot.csv"
-    csvpaths = _glob_csvpaths(basename_suffix)
-    snapshot_dfs = _get_snapshot_dfs(csvpaths, basename_suffix)
-
-    # for df in snapshot_dfs:
-    #     print(df)
-
-    # Keep in mind: an entity_type is either a top 'referrer', or a top 'path'.
-    # Find all entities seen across snapshots, by their name. For type referrer
-    # a specific entity(referrer) name might be `github.com`.
-
-    def _get_uens(snapshot_dfs):
-        unique_entity_names = set()
-        for df in snapshot_dfs:
-            unique_entity_names.update(df[entity_type].values)
+    csvpaths = _find_csvpaths(basename_suffix)
+    # Create a dataframe containing all information.
+    dfa = _read_top_x_snapshots(csvpaths, basename_suffix)
 
-        return unique_entity_names
-
-    unique_entity_names = _get_uens(snapshot_dfs)
-    log.info("all %s entities seen: %s", entity_type, unique_entity_names)
-
-    # Clarification: each snapshot dataframe corresponds to a single point in
+    # Clarification: each snapshot corresponds to a single point in
     # time (the snapshot time) and contains information about multiple top
     # referrers/paths. Now, invert that structure: work towards individual
     # dataframes where each dataframe corresponds to a single referrer/path,
     # and contains imformation about multiple timestamps
 
-    if not len(snapshot_dfs):
+    if dfa is None:
         MD_REPORT.write(
             textwrap.dedent(
                 f"""
@@ -529,16 +671,21 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
         )
         return
 
-    # First, create a dataframe containing all information.
-    dfa = pd.concat(snapshot_dfs)
-
     if len(dfa) == 0:
         log.info("leave early: no data for entity of type %s", entity_type)
         return
 
-    # Build a dict: key is path/referrer name, and value is DF with
-    # corresponding raw time series.
-    entity_dfs = _build_entity_dfs(dfa, entity_type, unique_entity_names)
+    # Keep in mind: an entity_type is either a top 'referrer', or a top 'path'.
+    # Find all entities seen across snapshots, by their name. For type referrer
+    # a specific entity(referrer) name might be `github.com`. Use the hash-based
+    # unique() (instead of building a Python set from all rows).
+    log.info("all %s entities seen: %s", entity_type, list(dfa[entity_type].unique()))
+
+    if entity_type == "path":
+        _shorten_path_names(dfa)
+
+    # Now use datetime column as index. Sort once, for all entities.
+    dfa = _sort_by_index(dfa.set_index("time"))
 
     # It's important to clarify what each data point in a per-referrer raw time
     # series means. Each data point has been returned by the GitHub traffic
@@ -558,25 +705,26 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
     # One interesting way to look at the data: find the top 5 referrers based
     # on unique views, and for the entire time range seen.
 
-    max_vu_map = {}
-    for ename, edf in entity_dfs.items():
-        # TODO: do not pick max() value across time series for top-n
-        # consideration. That represents a peak, a single point in time which
-        # could be long ago. It's more meaningful to integerate over time,
-        # considering the entire time frame. That however might put a little
-        # too much weight on the past, too -- so maybe perform two
-        # integrations: entire time frame, and last three weeks. Build top N
-        # for both of these, and then merge.
-        max_vu_map[ename] = edf["views_unique"].max()
-    del ename, edf
-
-    # Sort dict so that the first item is the referrer/path with the highest
-    # views_unique seen.
-    sorted_dict = {
-        k: v for k, v in sorted(max_vu_map.items(), key=lambda i: i[1], reverse=True)
-    }
+    # TODO: do not pick max() value across time series for top-n
+    # consideration. That represents a peak, a single point in time which
+    # could be long ago. It's more meaningful to integerate over time,
+    # considering the entire time frame. That however might put a little
+    # too much weight on the past, too -- so maybe perform two
+    # integrations: entire time frame, and last three weeks. Build top N
+    # for both of these, and then merge.
+    # Compute the max for all entities in one groupby reduction. Sort so that
+    # the first item is the referrer/path with the highest views_unique seen
+    # (stable sort: ties remain in order of first appearance). Note: `dfa` is
+    # deliberately NumPy-backed (not using Arrow-backed dtypes): Altair 4 cannot
+    # serialize Arrow-backed columns, and converting back and forth costs more
+    # than an Arrow-based groupby saves.
+    max_vu = (
+        dfa.groupby(entity_type, sort=False, observed=True)["views_unique"]
+        .max()
+        .sort_values(ascending=False, kind="stable")
+    )
 
-    log.info(f"{entity_type}, highest views_unique seen: {sorted_dict}")
+    log.info(f"{entity_type}, highest views_unique seen: {max_vu.to_dict()}")
 
     # log.info(entity_dfs['linkedin.com'])
     # log.info(entity_dfs['vega.github.io'])
@@ -588,29 +736,38 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
     # sys.exit()
 
     top_n = 7
-    top_n_enames = list(sorted_dict.keys())[:top_n]
-
-    # Build individual views_unique over time series. These series might have
-    # partially overlapping or non-overlapping datetime indices. Name these
-    # series (ename is for example 'linkedin.com' if this is a top_referrers
-    # analysis).
-    individual_series = [
-        pd.Series(entity_dfs[ename]["views_unique"], name=ename)
-        for ename in top_n_enames
-    ]
-
-    # The individual series have overlapping or non-overlapping indices.
-    # Concatenate the series (along the right, i.e. add each series as
-    # individual column (which is why naming the series above is important)).
-    # This fills NaN values for individual columns where appropriate.
-    df_top_vu = pd.concat(individual_series, axis=1)
-
+    top_n_enames = list(max_vu.index[:top_n])
+
+    # Build the views_unique time series for each of the top N entities, as
+    # one column per entity (column name is for example 'linkedin.com' if this
+    # is a top_referrers analysis). These time series might have partially
+    # overlapping or non-overlapping datetime indices: the pivot fills NaN
+    # values for individual columns where appropriate.
+    # Make it so that there is at most one data point per day, in case
+    # individual snapshots were taken with higher frequency: group samples by
+    # day (note the value for each day at the left edge of the 24 hour bin),
+    # and take the max() for each group. Days without samples do not show up.
+    # Do all that in one pivot operation (instead of building and then
+    # re-aligning one dataframe per entity).
+    dfa_top = dfa[dfa[entity_type].isin(top_n_enames)]
+    log.debug("dfa (top %s %ss):\n%s", top_n, entity_type, dfa_top)
+    df_top_vu = dfa_top.pivot_table(
+        index=dfa_top.index.floor("D"),
+        columns=entity_type,
+        values="views_unique",
+        aggfunc="max",
+        observed=True,
+    )[top_n_enames]
+
+    # Rendering a dataframe as text is relatively costly: do that only when
+    # debug logging is enabled (formatting of logging args is deferred).
     log.info(
-        "The top %s %s based on unique views, for the entire time range seen:\n%s",
+        "The top %s %s based on unique views, for the entire time range seen: %s",
         top_n,
         entity_type,
-        df_top_vu,
+        top_n_enames,
     )
+    log.debug("df_top_vu:\n%s", df_top_vu)
 
     n_datapoints = df_top_vu.shape[0] * df_top_vu.shape[1]
     if n_datapoints > 3000:
@@ -641,27 +798,30 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
         # though). Also see
         # https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.resample.html
         df_top_vu = df_top_vu.resample("5d", origin="end").last(min_count=1)
-        log.info(
-            "after downsample:\n%s",
-            df_top_vu,
-        )
-
-    # For plotting with Altair, reshape the data using pd.melt() to combine the
-    # multiple columns into one, where the referrer name is not a column label,
-    # but a value in a column. Ooor we could use the
-    # transform_fold() technique
+        log.info("after downsample: %s rows", len(df_top_vu))
+        log.debug("after downsample:\n%s", df_top_vu)
+
+    # For plotting with Altair, the multiple columns need to be combined into
+    # one, where the referrer name is not a column label, but a value in a
+    # column. Do not reshape the data using pd.melt() for that (that would
+    # repeat timestamp and referrer name for each data point in the chart
+    # data). Instead, pass the wide data and use the transform_fold() technique
     # https://altair-viz.github.io/user_guide/data.html#converting-between-long-form-and-wide-form-pandas
-    # with .transform_fold(top_n_rnames, as_=["referrer", "views_unique"])
-    # Also copy index into a normal column via `reset_index()` for
+    # i.e. have the reshaping be done by Vega-Lite in the browser. Also copy
+    # index into a normal column via `reset_index()` for
     # https://altair-viz.github.io/user_guide/data.html#including-index-data
-    df_melted = df_top_vu.melt(
-        var_name=entity_type, value_name="views_unique", ignore_index=False
-    ).reset_index()
-    # print(df_melted)
-
-    # Normalize main metric to show a view count _per day_, and clarify in the
-    # plot that this is a _mean_ value derived from the _last 14 days_.
-    df_melted["views_unique_norm"] = df_melted["views_unique"] / 14.0
+    df_top_vu = df_top_vu.reset_index()
+
+    # Vega-Lite interprets dots and brackets in field names as nested field
+    # access: escape these characters in the column names (referrer/path names
+    # such as `t.co`, or `/blob/master/data.csv`) passed to the fold transform.
+    fold_fields = [
+        n.replace("\\", "\\\\")
+        .replace(".", "\\.")
+        .replace("[", "\\[")
+        .replace("]", "\\]")
+        for n in top_n_enames
+    ]
 
     # See issue #52, chart.to_json() below did warn us when the df_melted got a
     # little too big. In a test case with daily data for more than a year a
@@ -672,28 +832,39 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
     # sample per three days instead of one per day. That's why above there is a
     # downsampling step. In the specific scenario described before, this
     # further reduced the number of rows from 3507 to 728.
-    log.info("melted df shape: %s", df_melted.shape)
+    # The number of data points is what the melted df row count was.
+    n_datapoints = len(df_top_vu) * len(top_n_enames)
+    log.info("data points to plot: %s", n_datapoints)
 
-    if len(df_melted) > 5000:
+    if n_datapoints > 5000:
         log.warning(
-            "df_melted has more than 5000 rows -- think about reducing the data points to plot"
+            "more than 5000 data points -- think about reducing the data points to plot"
         )
 
-    y_axis_scale_type = symlog_or_lin(df_melted, "views_unique_norm", 8)
+    # Normalize main metric to show a view count _per day_, and clarify in the
+    # plot that this is a _mean_ value derived from the _last 14 days_. Do that
+    # in the browser (calculate transform, below): the chart data then carries
+    # the (integer) view counts instead of long fractional numbers.
+    # Value range across all top N time series, in one pass over the 2D block
+    # (NaN values: days without data for an entity).
+    vu = df_top_vu[top_n_enames].to_numpy()
+    vu_norm_min, vu_norm_max = np.nanmin(vu) / 14.0, np.nanmax(vu) / 14.0
+    y_axis_scale_type = symlog_or_lin_for_range(
+        "views_unique_norm", vu_norm_min, vu_norm_max, 8
+    )
 
     x_kwargs = DATETIME_AXIS_PROPERTIES.copy()
     if date_axis_lim is not None:
         log.info("custom time window for top %s plot: %s", entity_type, date_axis_lim)
         x_kwargs["scale"] = alt.Scale(domain=date_axis_lim)
 
-    panel_props = {
-        "height": 300,
-        "width": "container",
-        "padding": 10,
-    }
-
     chart = (
-        alt.Chart(df_melted)
+        alt.Chart(df_top_vu)
+        .transform_fold(fold_fields, as_=[entity_type, "views_unique"])
+        # Keep missing values missing (null / 14 would evaluate to 0).
+        .transform_calculate(
+            views_unique_norm="isValid(datum.views_unique) ? datum.views_unique / 14 : null"
+        )
         .mark_line(point=True)
         # .encode(x="time:T", y="views_unique:Q", color="referrer:N")
         # the pandas dataframe datetimeindex contains timing information at
@@ -710,7 +881,7 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
                 type="quantitative",
                 title="unique visitors per day (mean from last 14 days)",
                 scale=alt.Scale(
-                    domain=(0, df_melted["views_unique_norm"].max() * 1.1),
+                    domain=(0, vu_norm_max * 1.1),
                     zero=True,
                     type=y_axis_scale_type,
                 ),
@@ -730,7 +901,7 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
                 },
             ),
             tooltip=[
-                entity_type,
+                alt.Tooltip(entity_type, type="nominal"),
                 alt.Tooltip(
                     "views_unique_norm:Q", format=".2f", title="views (14d mean)"
                 ),
@@ -738,7 +909,7 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
             ],
         )
         .configure_point(size=30)
-        .properties(**panel_props)
+        .properties(**PANEL_PROPERTIES)
     )
 
     chart_spec = chart.to_json(indent=None)
@@ -753,7 +924,7 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
     # Textual form: larger N, and no cutoff (arbitrary length and legend of
     # plot don't go well with each other).
     top_n = 15
-    top_n_enames = list(sorted_dict.keys())[:top_n]
+    top_n_enames = list(max_vu.index[:top_n])
     top_n_enames_string_for_md = ", ".join(
         f"{str(i).zfill(2)}: `{n}`" for i, n in enumerate(top_n_enames, 1)
     )
@@ -779,96 +950,245 @@ def analyse_top_x_snapshots(entity_type, date_axis_lim):
     )
 
 
-def analyse_view_clones_ts_fragments() -> pd.DataFrame:
-    log.info("read views/clones time series fragments (CSV docs)")
+def _drop_duplicate_samples(df: pd.DataFrame) -> pd.DataFrame:
+    # Group by timestamp (index), take the maximum. With the input sorted by
+    # time, each group is a contiguous block of rows: find the row offsets
+    # where a new timestamp starts, and reduce each block to its column-wise
+    # maximum with a single vectorized np.maximum.reduceat() call (instead of
+    # the factorize/bookkeeping overhead of groupby().max()). All columns are
+    # integer counts here, i.e. `to_numpy()` does not need to upcast.
+    # Note: picking one complete row per timestamp (e.g. the "last" one after
+    # sorting) would not be equivalent: the maximum for e.g. `views_total` and
+    # the maximum for `clones_total` may come from different fragments.
+    # Note: this is one pass over a small array (one row per day and fragment,
+    # i.e. thousands of rows even for years of history). A JIT-compiled
+    # kernel (numba) would not pay off its compile time / dependency weight.
+    df = _sort_by_index(df)
+    ts = df.index.asi8
+    is_first = np.concatenate(([True], ts[1:] != ts[:-1]))
+
+    # Special case: no timestamp seen more than once (e.g. only the previous
+    # aggregate is used, or there is just a single fragment). No grouping
+    # required. Detect that from the sorted index (instead of a separate,
+    # hash-based `is_unique` check).
+    if is_first.all():
+        log.info("no duplicate timestamps, skip grouping")
+        return df
 
-    basename_suffix = "_views_clones_series_fragment.csv"
-    csvpaths = _glob_csvpaths(basename_suffix)
+    starts = np.flatnonzero(is_first)
+    return pd.DataFrame(
+        np.maximum.reduceat(df.to_numpy(), starts, axis=0),
+        index=df.index[starts],
+        columns=df.columns,
+    )
 
-    snapshot_dfs: list[pd.DataFrame] = []
-    column_names_seen: Set[str] = set()
 
-    for p in csvpaths:
-        log.info("attempt to parse %s", p)
-        snapshot_time = _get_snapshot_time_from_path(p, basename_suffix)
+def _gen_views_clones_chart(column, value_range, y_title, tooltip_title, x_kwargs):
+    import altair as alt  # type: ignore
 
-        df = pd.read_csv(  # type: ignore
-            p,
-            index_col=["time_iso8601"],
-            date_parser=lambda col: pd.to_datetime(col, utc=True),
+    # Build line chart for one of the four views/clones metrics. These charts
+    # only differ in the column shown, and in the (y axis, tooltip) titles.
+    # The chart does not inline the data: it refers to the named dataset
+    # `VIEWS_CLONES_DATASET_NAME` which is defined once in the HTML document
+    # and shared by all views/clones charts. `value_range` is the (min, max)
+    # tuple of the values in `column`, used for deriving axis properties.
+    rmin, rmax = value_range
+    yaxis = alt.Axis()
+    yaxistype = symlog_or_lin_for_range(column, rmin, rmax, 100)
+    if yaxistype == "symlog":
+        yaxis = alt.Axis(values=SYMLOG_AXIS_VALUES)
+
+    return (
+        (
+            alt.Chart(
+                alt.NamedData(
+                    name=VIEWS_CLONES_DATASET_NAME, format=VIEWS_CLONES_DATA_FORMAT
+                )
+            )
+            .mark_line(point=True)
+            .encode(
+                alt.X(**x_kwargs),
+                alt.Y(
+                    column,
+                    type="quantitative",
+                    title=y_title,
+                    axis=yaxis,
+                    scale=alt.Scale(
+                        domain=(0, rmax * 1.1),
+                        zero=True,
+                        type=yaxistype,
+                    ),
+                ),
+                tooltip=[
+                    alt.Tooltip(f"{column}:Q", format=".1f", title=tooltip_title),
+                    alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
+                ],
+            )
         )
+        .configure_axisY(labelBound=True)
+        .configure_point(size=20)
+        .properties(**VIEWS_CLONES_PANEL_PROPERTIES)
+    )
 
-        # Skip logic for empty data frames. The CSV files written should never
-        # be empty, but if such a bad file made it into the file system then
-        # skipping here facilitates debugging and enhanced robustness.
-        if len(df) == 0:
-            log.warning("empty dataframe parsed from %s, skip", p)
-            continue
-
-        # A time series fragment might look like this:
-        #
-        # df_views_clones:
-        #                            clones_total  ...  views_unique
-        # time_iso8601                             ...
-        # 2020-12-21 00:00:00+00:00           NaN  ...             2
-        # 2020-12-22 00:00:00+00:00           2.0  ...            23
-        # 2020-12-23 00:00:00+00:00           2.0  ...            20
-        # ...
-        # 2021-01-03 00:00:00+00:00           8.0  ...            21
-        # 2021-01-04 00:00:00+00:00           7.0  ...            18
-        #
-        # Note the NaN and the floaty type.
-
-        # All metrics are known to be integers by definition here. NaN values
-        # are expected to be present anywhere in this dataframe, and they
-        # semantically mean "0". Therefore, replace those with zeros. Also see
-        # https://github.com/jgehrcke/github-repo-stats/issues/4
-        df = df.fillna(0)
-        # Make sure numbers are treated as integers from here on. This actually
-        # matters in a cosmetic way only for outputting the aggregate CSV later
-        # #       # not for plotting and number crunching).
-        df = df.astype(int)
-
-        # attach snapshot time as meta data prop to df
-        df.attrs["snapshot_time"] = snapshot_time
-
-        # The index is not of string type anymore, but of type
-        # `pd.DatetimeIndex`. Reflect that in the name.
-        df.index.rename("time", inplace=True)
-
-        if column_names_seen and set(df.columns) != column_names_seen:
-            log.error("columns seen so far: %s", column_names_seen)
-            log.error("columns in %s: %s", p, df.columns)
-            sys.exit(1)
 
-        # `.columns` is known to be only strings
-        column_names_seen.update(cast(Iterator[str], df.columns))
+def _derive_views_clones_chart_spec(
+    template: dict, column, value_range, y_title, tooltip_title
+) -> dict:
+    # Building a chart with Altair is costly (object construction triggers
+    # schema validation, e.g. in `properties()`). The four views/clones
+    # charts are structurally identical: build one of them with Altair (see
+    # `_gen_views_clones_chart()`), and derive the Vega-Lite specs (dicts) for
+    # the other ones from that by substituting the metric-specific parts.
+    # Axis and scale properties are derived from `value_range` in the same way
+    # as in `_gen_views_clones_chart()`.
+    rmin, rmax = value_range
+    spec = copy.deepcopy(template)
+    y = spec["encoding"]["y"]
+    y["field"] = column
+    y["title"] = y_title
+    yaxistype = symlog_or_lin_for_range(column, rmin, rmax, 100)
+    y["axis"] = {"values": SYMLOG_AXIS_VALUES} if yaxistype == "symlog" else {}
+    y["scale"].update({"domain": [0, rmax * 1.1], "type": yaxistype})
+
+    tooltip = spec["encoding"]["tooltip"][0]
+    tooltip["field"] = column
+    tooltip["title"] = tooltip_title
+    return spec
+
+
+def _read_views_clones_fragment(p: str):
+    import pyarrow as pa  # type: ignore
+    import pyarrow.csv as pacsv  # type: ignore
+
+    log.debug("attempt to parse %s", p)
+    # Parse into an Arrow table, and parse timestamps as part of that (in
+    # Arrow's CSV reader, no separate timestamp parsing step). Read metrics as
+    # floating point numbers (see `VIEWS_CLONES_METRIC_COLUMNS`). Files are
+    # read concurrently already: do not spawn more threads per file.
+    column_types = {"time_iso8601": pa.timestamp("ns", tz="UTC")}
+    column_types.update({c: pa.float64() for c in VIEWS_CLONES_METRIC_COLUMNS})
+    table = pacsv.read_csv(
+        p,
+        read_options=pacsv.ReadOptions(use_threads=False),
+        convert_options=pacsv.ConvertOptions(column_types=column_types),
+    )
 
-        df = df.sort_index()
+    # Skip logic for empty data frames. The CSV files written should never
+    # be empty, but if such a bad file made it into the file system then
+    # skipping here facilitates debugging and enhanced robustness.
+    if table.num_rows == 0:
+        log.warning("empty dataframe parsed from %s, skip", p)
+        return p, None
+
+    return p, table
+
+
+def _read_views_clones_fragments(csvpaths, basename_suffix) -> Optional[pd.DataFrame]:
+    # Read all views/clones time series fragments, concatenate them, and
+    # return the result as a single DataFrame with a `pd.DatetimeIndex` (or
+    # None if no (non-empty) fragment was found). For each sample (row), the
+    # `snapshot_time` column holds the snapshot time of the fragment it
+    # originates from. Required for a sanity check.
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+
+    # Skip fragments that were found to be empty.
+    fragments = [
+        (p, t)
+        for p, t in _read_csv_files_concurrently(_read_views_clones_fragment, csvpaths)
+        if t is not None
+    ]
+    _check_columns_consistent([(p, t.column_names) for p, t in fragments])
 
-        # Sanity check: snapshot time _after_ latest timestamp in time series?
-        # This could hit in on a machine with a bad time setting when fetching
-        # data.
-        if df.index.max() > snapshot_time:
-            log.error(
-                "for CSV file %s the snapshot time %s is older than the newest sample",
-                p,
-                snapshot_time,
+    log.info(
+        "read %s fragment(s), total sample count: %s",
+        len(fragments),
+        sum(t.num_rows for _, t in fragments),
+    )
+    if not fragments:
+        return None
+
+    # Concatenate in Arrow (cheap, no copy of the column data), and convert
+    # to pandas once, for all fragments.
+    table = pa.concat_tables([t for _, t in fragments], promote=True)
+
+    # A time series fragment might look like this:
+    #
+    # df_views_clones:
+    #                            clones_total  ...  views_unique
+    # time_iso8601                             ...
+    # 2020-12-21 00:00:00+00:00           NaN  ...             2
+    # 2020-12-22 00:00:00+00:00           2.0  ...            23
+    # 2020-12-23 00:00:00+00:00           2.0  ...            20
+    # ...
+    # 2021-01-03 00:00:00+00:00           8.0  ...            21
+    # 2021-01-04 00:00:00+00:00           7.0  ...            18
+    #
+    # All metrics are known to be integers by definition here. NaN values
+    # (nulls) are expected to be present anywhere in this table, and they
+    # semantically mean "0". Therefore, replace those with zeros. Also see
+    # https://github.com/jgehrcke/github-repo-stats/issues/4
+    # Make sure numbers are treated as (non-nullable) integers from here
+    # on. This matters for outputting the aggregate CSV later, and for
+    # memory consumption / speed of number crunching. The cast is a safe
+    # cast: it errors out for values that are not integers.
+    for i, name in enumerate(table.column_names):
+        if name != "time_iso8601":
+            table = table.set_column(
+                i, name, pc.cast(pc.fill_null(table.column(i), 0), pa.int32())
             )
-            sys.exit(1)
 
-        snapshot_dfs.append(df)
+    snapshot_times = _get_snapshot_times_from_paths(
+        [p for p, _ in fragments], basename_suffix
+    )
+    table = table.append_column(
+        "snapshot_time",
+        pa.array(
+            np.repeat(snapshot_times.asi8, [t.num_rows for _, t in fragments]),
+            type=pa.timestamp("ns", tz="UTC"),
+        ),
+    )
+
+    # The individual fragment tables are not needed anymore. Drop the
+    # references so that their memory can be freed before building up the
+    # aggregate (peak memory usage should not be governed by the sum of
+    # all fragments plus the concatenation result plus the aggregate).
+    fragments.clear()
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+
+    # Use the timestamps as index. The index is not of string type anymore,
+    # but of type `pd.DatetimeIndex`. Reflect that in the name.
+    df.index = pd.DatetimeIndex(df.pop("time_iso8601"), name="time")
+    return df
 
-    # for df in snapshot_dfs:
-    #     print(df)
 
-    log.info("total sample count: %s", sum(len(df) for df in snapshot_dfs))
+def analyse_view_clones_ts_fragments() -> pd.DataFrame:
+    import altair as alt  # type: ignore
+
+    log.info("read views/clones time series fragments (CSV docs)")
 
-    if len(snapshot_dfs) == 0:
+    basename_suffix = "_views_clones_series_fragment.csv"
+    csvpaths = _find_csvpaths(basename_suffix)
+
+    df_allsnapshots = _read_views_clones_fragments(csvpaths, basename_suffix)
+    if df_allsnapshots is None:
         log.info("special case: no snapshots read for views/clones")
     else:
-        newest_snapshot_time = max(df.attrs["snapshot_time"] for df in snapshot_dfs)
-        log.info("time of newest snapshot: %s", newest_snapshot_time)
+        # Sanity check: snapshot time _after_ latest timestamp in time series?
+        # This could hit in on a machine with a bad time setting when fetching
+        # data.
+        snapshot_times = df_allsnapshots.pop("snapshot_time")
+        too_new = df_allsnapshots.index > snapshot_times
+        if too_new.any():
+            log.error(
+                "for CSV file(s) with snapshot time(s) %s the snapshot time is "
+                "older than the newest sample",
+                ", ".join(str(t) for t in snapshot_times[too_new].unique()),
+            )
+            sys.exit(1)
+
+        log.info("time of newest snapshot: %s", snapshot_times.max())
 
     # Read previously created views/clones aggregate file if it exists.
     df_prev_agg = None
@@ -876,20 +1196,16 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
         if os.path.exists(ARGS.views_clones_aggregate_inpath):
             log.info("read previous aggregate: %s", ARGS.views_clones_aggregate_inpath)
 
-            df_prev_agg = pd.read_csv(  # type: ignore
-                ARGS.views_clones_aggregate_inpath,
-                index_col=["time_iso8601"],
-                date_parser=lambda col: pd.to_datetime(col, utc=True),
-            )
-
-            df_prev_agg.index.rename("time", inplace=True)
+            df_prev_agg = read_views_clones_aggregate(
+                ARGS.views_clones_aggregate_inpath
+            ).astype("int32")
         else:
             log.info(
                 "previous aggregate file does not exist: %s",
                 ARGS.views_clones_aggregate_inpath,
             )
 
-    if len(snapshot_dfs) == 0 and df_prev_agg is None:
+    if df_allsnapshots is None and df_prev_agg is None:
         # The report structure is not prepared to make sense w/o availability
         # of view/clone data. This state is forbidden for now. In the future,
         # it miiiight make sense to allow this special case: only show
@@ -901,20 +1217,18 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
         sys.exit(1)
 
     log.info("build aggregate, drop duplicate data")
-    # Each dataframe in `snapshot_dfs` corresponds to one time series fragment
-    # ("snapshot") obtained from the GitHub API. Each time series fragment
+    # `df_allsnapshots` is the concatenation of all time series fragments
+    # ("snapshots") obtained from the GitHub API. Each time series fragment
     # contains 15 samples (rows), with two adjacent samples being 24 hours
     # apart. Ideally, the time series fragments overlap in time. They overlap
     # potentially by a lot, depending on when the individual snapshots were
     # taken (think: take one snapshot per day; then 14 out of 15 data points
     # are expected to be "the same" as in the snapshot taken the day before).
-    # Stich these fragments together (with a buch of "duplicate samples), and
-    # then sort this result by time.
-    if len(snapshot_dfs):
-        # combine all snapshots
-        log.info("pd.concat(snapshot_dfs)")
-        df_allsnapshots = pd.concat(snapshot_dfs)
-
+    # Stitch these fragments (plus the previous aggregate, if given) together,
+    # with a bunch of duplicate samples. `_drop_duplicate_samples()` below then
+    # sorts this concatenation by time once, and reduces each group of
+    # duplicate samples to one.
+    if df_allsnapshots is not None:
         # Combine the result of combine-all-snapshots with previous aggregate
         dfall = df_allsnapshots
         if df_prev_agg is not None:
@@ -925,17 +1239,16 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
                     df_allsnapshots.columns,
                 )
                 sys.exit(1)
-            log.info("pd.concat(dfall, df_prev_agg)")
-            dfall = pd.concat([df_allsnapshots, df_prev_agg])
+            # Previous aggregate first: it covers the older part of the time
+            # series (keeps the concatenation mostly sorted by time).
+            log.info("pd.concat(df_prev_agg, dfall)")
+            dfall = pd.concat([df_prev_agg, df_allsnapshots], copy=False, sort=False)
 
     else:
         assert df_prev_agg is not None
         dfall = df_prev_agg
 
-    dfall.sort_index(inplace=True)
-
     log.info("shape of dataframe before dropping duplicates: %s", dfall.shape)
-    # print(dfall)
 
     # Now, the goal is to drop duplicate data. And again, as of a lot of
     # overlap between snapshots there's a lot of duplicate data to be expected.
@@ -956,9 +1269,13 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
     # data) we want to look for the maximum data value for any given timestamp.
     # Using that method, we effectively ignore said cutoff artifact. In short:
     # group by timestamp (index), take the maximum.
-    df_agg: pd.DataFrame = dfall.groupby(dfall.index).max()
+    df_agg = _drop_duplicate_samples(dfall)
     log.info("shape of dataframe after dropping duplicates: %s", df_agg.shape)
 
+    # From here on, only work with the aggregate. Allow for freeing the memory
+    # held by the (potentially much larger) data with duplicates.
+    del dfall, df_allsnapshots, df_prev_agg
+
     # Get time range, to be returned by this function. Used later for setting
     # plot x_limit in all views/clones plot, but also in other plots in the
     # report (views/clones is likely the most complete data -- i.e. the  widest
@@ -984,7 +1301,10 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
         log.info("write aggregate to %s", ARGS.views_clones_aggregate_outpath)
         # Pragmatic strategy against partial write / encoding problems.
         tpath = ARGS.views_clones_aggregate_outpath + ".tmp"
-        df_agg.to_csv(tpath, index_label="time_iso8601")
+        if _is_parquet_path(ARGS.views_clones_aggregate_outpath):
+            df_agg.to_parquet(tpath, compression="zstd")  # type: ignore
+        else:
+            df_agg.to_csv(tpath, index_label="time_iso8601")
         os.rename(tpath, ARGS.views_clones_aggregate_outpath)
 
         if ARGS.delete_ts_fragments:
@@ -997,175 +1317,46 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
                 except Exception as e:
                     log.warning("could not unlink %s: %s", p, str(e))
 
-    # print(df_agg)
-
-    # matplotlib_config()
-    # log.info("aggregated sample count: %s", len(df_agg))
-    # df_agg.plot(
-    #     linestyle="solid",
-    #     marker="o",
-    #     markersize=5,
-    #     subplots=True,
-    #     # ylabel="count",
-    #     xlabel="",
-    #     # logy="sym",
-    # )
-    # plt.ylim([0, None])
-    # plt.tight_layout()
-    # plt.show()
-
-    # Why reset_index()? See
-    # https://github.com/altair-viz/altair/issues/271#issuecomment-573480284
-    # Use new name for df to be kept around for returning, before reset_index()
-    # so that df.index is kept meaningful.
-    df_agg_for_return = df_agg
-    df_agg = df_agg.reset_index()
-    df_agg_views = df_agg.drop(columns=["clones_unique", "clones_total"])
-    df_agg_clones = df_agg.drop(columns=["views_unique", "views_total"])
-
-    PANEL_WIDTH = "container"
-    PANEL_HEIGHT = 200
-
-    panel_props = {"height": PANEL_HEIGHT, "width": PANEL_WIDTH, "padding": 10}
+    # Determine min and max for all four metrics in one go (used for deriving
+    # y axis properties for each chart).
+    value_ranges = {
+        c: (r["min"], r["max"]) for c, r in df_agg.agg(["min", "max"]).items()
+    }
 
     x_kwargs = DATETIME_AXIS_PROPERTIES.copy()
 
     # sync date axis range across all views/clone plots.
     x_kwargs["scale"] = alt.Scale(domain=date_axis_lim)
 
-    yaxis = alt.Axis()
-    yaxistype = symlog_or_lin(df_agg_clones, "clones_unique", 100)
-    if yaxistype == "symlog":
-        yaxis = alt.Axis(values=[1, 10, 50, 100, 500, 1000, 5000, 10000])
-    chart_clones_unique = (
-        (
-            alt.Chart(df_agg_clones)
-            .mark_line(point=True)
-            .encode(
-                alt.X(**x_kwargs),
-                alt.Y(
-                    "clones_unique",
-                    type="quantitative",
-                    title="unique clones per day",
-                    axis=yaxis,
-                    scale=alt.Scale(
-                        domain=(0, df_agg_clones["clones_unique"].max() * 1.1),
-                        zero=True,
-                        type=yaxistype,
-                    ),
-                ),
-                tooltip=[
-                    alt.Tooltip("clones_unique:Q", format=".1f", title="clones (u)"),
-                    alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
-                ],
-            )
-        )
-        .configure_axisY(labelBound=True)
-        .configure_point(size=20)
-        .properties(**panel_props)
+    # Build one chart with Altair (validated once), derive the others.
+    chart_views_unique = _gen_views_clones_chart(
+        "views_unique",
+        value_ranges["views_unique"],
+        "unique views per day",
+        "views (u)",
+        x_kwargs,
     )
-
-    yaxis = alt.Axis()
-    yaxistype = symlog_or_lin(df_agg_clones, "clones_total", 100)
-    if yaxistype == "symlog":
-        yaxis = alt.Axis(values=[1, 10, 50, 100, 500, 1000, 5000, 10000])
-    chart_clones_total = (
-        (
-            alt.Chart(df_agg_clones)
-            .mark_line(point=True)
-            .encode(
-                alt.X(**x_kwargs),
-                alt.Y(
-                    "clones_total",
-                    type="quantitative",
-                    title="total clones per day",
-                    axis=yaxis,
-                    scale=alt.Scale(
-                        domain=(0, df_agg_clones["clones_total"].max() * 1.1),
-                        zero=True,
-                        type=yaxistype,
-                    ),
-                ),
-                tooltip=[
-                    alt.Tooltip("clones_total:Q", format=".1f", title="clones (t)"),
-                    alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
-                ],
-            )
+    spec_template = chart_views_unique.to_dict()
+    chart_specs = {"chart_views_unique": spec_template}
+    for div_id, column, y_title, tooltip_title in (
+        ("chart_views_total", "views_total", "total views per day", "views (t)"),
+        ("chart_clones_unique", "clones_unique", "unique clones per day", "clones (u)"),
+        ("chart_clones_total", "clones_total", "total clones per day", "clones (t)"),
+    ):
+        chart_specs[div_id] = _derive_views_clones_chart_spec(
+            spec_template, column, value_ranges[column], y_title, tooltip_title
         )
-        .configure_axisY(labelBound=True)
-        .configure_point(size=20)
-        .properties(**panel_props)
-    )
 
-    yaxis = alt.Axis()
-    yaxistype = symlog_or_lin(df_agg_views, "views_unique", 100)
-    if yaxistype == "symlog":
-        yaxis = alt.Axis(values=[1, 10, 50, 100, 500, 1000, 5000, 10000])
-    chart_views_unique = (
-        (
-            alt.Chart(df_agg_views)
-            .mark_line(point=True)
-            .encode(
-                alt.X(**x_kwargs),
-                alt.Y(
-                    "views_unique",
-                    type="quantitative",
-                    title="unique views per day",
-                    axis=yaxis,
-                    scale=alt.Scale(
-                        domain=(0, df_agg_views["views_unique"].max() * 1.1),
-                        zero=True,
-                        type=yaxistype,
-                    ),
-                ),
-                tooltip=[
-                    alt.Tooltip("views_unique:Q", format=".1f", title="views (u)"),
-                    alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
-                ],
-            )
-        )
-        .configure_axisY(labelBound=True)
-        .configure_point(size=20)
-        .properties(**panel_props)
+    # Serialize the data shared by all four charts once, as CSV (see
+    # `VIEWS_CLONES_DATA_FORMAT`). The time index is written as a normal
+    # column, with timestamps in ISO 8601 notation (the index is in UTC).
+    views_clones_data_csv = df_agg.to_csv(
+        index_label="time", date_format="%Y-%m-%dT%H:%M:%SZ", lineterminator="\n"
     )
-
-    yaxis = alt.Axis()
-    yaxistype = symlog_or_lin(df_agg_views, "views_total", 100)
-    if yaxistype == "symlog":
-        yaxis = alt.Axis(values=[1, 10, 50, 100, 500, 1000, 5000, 10000])
-    chart_views_total = (
-        (
-            alt.Chart(df_agg_views)
-            .mark_line(point=True)
-            .encode(
-                alt.X(**x_kwargs),
-                alt.Y(
-                    "views_total",
-                    type="quantitative",
-                    title="total views per day",
-                    axis=yaxis,
-                    scale=alt.Scale(
-                        domain=(0, df_agg_views["views_total"].max() * 1.1),
-                        zero=True,
-                        type=yaxistype,
-                    ),
-                ),
-                tooltip=[
-                    alt.Tooltip("views_total:Q", format=".1f", title="views (t)"),
-                    alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
-                ],
-            )
-        )
-        .configure_axisY(labelBound=True)
-        .configure_point(size=20)
-        .properties(**panel_props)
+    datasets_js = (
+        f"{{datasets: {{{json.dumps(VIEWS_CLONES_DATASET_NAME)}: viewsClonesData}}}}"
     )
 
-    chart_views_unique_spec = chart_views_unique.to_json(indent=None)
-    chart_views_total_spec = chart_views_total.to_json(indent=None)
-    chart_clones_unique_spec = chart_clones_unique.to_json(indent=None)
-    chart_clones_total_spec = chart_clones_total.to_json(indent=None)
-
     MD_REPORT.write(
         textwrap.dedent(
             f"""
@@ -1176,12 +1367,12 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
     #### Unique visitors
     <div id="chart_views_unique" class="full-width-chart"></div>
 
-    Cumulative: {df_agg_views["views_unique"].sum()}
+    Cumulative: {df_agg["views_unique"].sum()}
 
     #### Total views
     <div id="chart_views_total" class="full-width-chart"></div>
 
-    Cumulative: {df_agg_views["views_total"].sum()}
+    Cumulative: {df_agg["views_total"].sum()}
 
     <div class="pagebreak-for-print"> </div>
 
@@ -1190,26 +1381,62 @@ def analyse_view_clones_ts_fragments() -> pd.DataFrame:
     #### Unique cloners
     <div id="chart_clones_unique" class="full-width-chart"></div>
 
-    Cumulative: {df_agg_clones["clones_unique"].sum()}
+    Cumulative: {df_agg["clones_unique"].sum()}
 
     #### Total clones
     <div id="chart_clones_total" class="full-width-chart"></div>
 
-    Cumulative: {df_agg_clones["clones_total"].sum()}
+    Cumulative: {df_agg["clones_total"].sum()}
 
     """
         )
     )
-    JS_FOOTER_LINES.extend(
-        [
-            f"vegaEmbed('#chart_views_unique', {chart_views_unique_spec}, {VEGA_EMBED_OPTIONS_JSON}).catch(console.error);",
-            f"vegaEmbed('#chart_views_total', {chart_views_total_spec}, {VEGA_EMBED_OPTIONS_JSON}).catch(console.error);",
-            f"vegaEmbed('#chart_clones_unique', {chart_clones_unique_spec}, {VEGA_EMBED_OPTIONS_JSON}).catch(console.error);",
-            f"vegaEmbed('#chart_clones_total', {chart_clones_total_spec}, {VEGA_EMBED_OPTIONS_JSON}).catch(console.error);",
-        ]
+    # Keep the data inline (embedded once, shared by the four charts) instead
+    # of writing it to resources/ and referencing it via alt.UrlData: the
+    # report must render when opened from disk, and pdf.py loads it via a
+    # file:// URL; in both cases the browser refuses to fetch() a sibling
+    # file:// resource, leaving the charts empty.
+    JS_FOOTER_LINES.append(
+        f"const viewsClonesData = {json.dumps(views_clones_data_csv)};"
     )
+    for div_id, spec_dict in chart_specs.items():
+        # Serialize like Altair's `to_json()` does.
+        spec = json.dumps(spec_dict, indent=None, sort_keys=True)
+        JS_FOOTER_LINES.append(
+            f"vegaEmbed('#{div_id}', Object.assign({spec}, {datasets_js}), {VEGA_EMBED_OPTIONS_JSON}).catch(console.error);"
+        )
+
+    return df_agg
+
+
+def _gen_cumulative_count_chart(df, column, y_title, tooltip_title, x_kwargs):
+    import altair as alt  # type: ignore
 
-    return df_agg_for_return
+    # Build line chart for a cumulative event count (stargazers, forks). These
+    # charts only differ in the column shown, and in the (y axis, tooltip)
+    # titles.
+    return (
+        alt.Chart(df.reset_index())
+        .mark_line(point=True)
+        .encode(
+            alt.X(**x_kwargs),
+            alt.Y(
+                column,
+                type="quantitative",
+                title=y_title,
+                scale=alt.Scale(
+                    domain=(0, df[column].max() * 1.1),
+                    zero=True,
+                ),
+            ),
+            tooltip=[
+                alt.Tooltip(f"{column}:Q", format="d", title=tooltip_title),
+                alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
+            ],
+        )
+        .configure_point(size=50)
+        .properties(**PANEL_PROPERTIES)
+    )
 
 
 def add_stargazers_section(
@@ -1221,6 +1448,8 @@ def add_stargazers_section(
 
     Include a markdown section also for zero length time series (no stars)
     """
+    import altair as alt  # type: ignore
+
     if not len(df):
         MD_REPORT.write(
             textwrap.dedent(
@@ -1243,28 +1472,8 @@ def add_stargazers_section(
         log.info("custom time window for stargazer plot: %s", date_axis_lim)
         x_kwargs["scale"] = alt.Scale(domain=date_axis_lim)
 
-    panel_props = {"height": 300, "width": "container", "padding": 10}
-    chart = (
-        alt.Chart(df.reset_index())
-        .mark_line(point=True)
-        .encode(
-            alt.X(**x_kwargs),
-            alt.Y(
-                "stars_cumulative",
-                type="quantitative",
-                title="stargazer count (cumulative)",
-                scale=alt.Scale(
-                    domain=(0, df["stars_cumulative"].max() * 1.1),
-                    zero=True,
-                ),
-            ),
-            tooltip=[
-                alt.Tooltip("stars_cumulative:Q", format="d", title="stars"),
-                alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
-            ],
-        )
-        .configure_point(size=50)
-        .properties(**panel_props)
+    chart = _gen_cumulative_count_chart(
+        df, "stars_cumulative", "stargazer count (cumulative)", "stars", x_kwargs
     )
 
     chart_spec = chart.to_json(indent=None)
@@ -1306,6 +1515,8 @@ def add_fork_section(
 
     Include a markdown section also for zero length time series (no forks)
     """
+    import altair as alt  # type: ignore
+
     if not len(df):
         MD_REPORT.write(
             textwrap.dedent(
@@ -1328,28 +1539,8 @@ def add_fork_section(
         log.info("custom time window for fork plot: %s", date_axis_lim)
         x_kwargs["scale"] = alt.Scale(domain=date_axis_lim)
 
-    panel_props = {"height": 300, "width": "container", "padding": 10}
-    chart = (
-        alt.Chart(df.reset_index())
-        .mark_line(point=True)
-        .encode(
-            alt.X(**x_kwargs),
-            alt.Y(
-                "forks_cumulative",
-                type="quantitative",
-                title="fork count (cumulative)",
-                scale=alt.Scale(
-                    domain=(0, df["forks_cumulative"].max() * 1.1),
-                    zero=True,
-                ),
-            ),
-            tooltip=[
-                alt.Tooltip("forks_cumulative:Q", format="d", title="forks"),
-                alt.Tooltip("time:T", format="%B %e, %Y", title="date"),
-            ],
-        )
-        .configure_point(size=50)
-        .properties(**panel_props)
+    chart = _gen_cumulative_count_chart(
+        df, "forks_cumulative", "fork count (cumulative)", "forks", x_kwargs
     )
 
     chart_spec = chart.to_json(indent=None)
@@ -1382,10 +1573,9 @@ def add_fork_section(
     )
 
 
-def symlog_or_lin(df, colname, threshold):
-    # TODO: decide between 'linear' and 'symlog' axis based on the value range
-    rmin = df[colname].min()
-    rmax = df[colname].max()
+def symlog_or_lin_for_range(colname, rmin, rmax, threshold):
+    # Decide between 'linear' and 'symlog' axis scale type based on the value
+    # range [rmin, rmax] of the data shown on that axis (column `colname`).
     log.info(f"df[{colname}] min: {rmin}, max: {rmax}")
 
     if rmax - rmin > threshold:
@@ -1396,6 +1586,35 @@ def symlog_or_lin(df, colname, threshold):
     return "linear"
 
 
+def read_timeseries_csv(path: str) -> pd.DataFrame:
+    # Read a CSV file with a `time_iso8601` column, as written by fetch.py and
+    # by this program. Return dataframe with a tz-aware (UTC) DatetimeIndex
+    # named `time`. The pyarrow engine parses ISO 8601 timestamps natively (no
+    # Python-level date parser callback involved). `pd.to_datetime()` then is
+    # cheap, but still required for e.g. a CSV file with zero rows.
+    df = pd.read_csv(path, engine="pyarrow")
+    df.index = pd.DatetimeIndex(
+        pd.to_datetime(df.pop("time_iso8601"), utc=True, format="ISO8601"),
+        name="time",
+    )
+    return df
+
+
+def _is_parquet_path(path: str) -> bool:
+    return path.lower().endswith(".parquet")
+
+
+def read_views_clones_aggregate(path: str) -> pd.DataFrame:
+    # The views/clones aggregate is by default stored as CSV (human-readable,
+    # diffable when committed to a git repository). Alternatively, it can be
+    # stored in Parquet format (selected via file name extension) which is
+    # faster to read and write for long time series. The Parquet file stores
+    # the (tz-aware) `time` index as written by `to_parquet()`.
+    if _is_parquet_path(path):
+        return pd.read_parquet(path, engine="pyarrow")
+    return read_timeseries_csv(path)
+
+
 def read_stars_over_time_from_csv() -> pd.DataFrame:
     df_stargazers_complete = pd.DataFrame({"time": [], "stars_cumulative": []})
 
@@ -1408,14 +1627,8 @@ def read_stars_over_time_from_csv() -> pd.DataFrame:
     if os.path.exists(ARGS.stargazer_ts_inpath):
         log.info("Parse (raw) stargazer time series CSV: %s", ARGS.stargazer_ts_inpath)
 
-        df_40klim = pd.read_csv(  # type: ignore
-            ARGS.stargazer_ts_inpath,
-            index_col=["time_iso8601"],
-            date_parser=lambda col: pd.to_datetime(col, utc=True),
-        )
-
-        df_40klim.index.rename("time", inplace=True)
-        log.info("stars_cumulative, raw data: %s", df_40klim["stars_cumulative"])
+        df_40klim = read_timeseries_csv(ARGS.stargazer_ts_inpath)
+        log.debug("stars_cumulative, raw data:\n%s", df_40klim["stars_cumulative"])
 
         if not len(df_40klim):
             log.info("CSV file did not contain data, return empty df")
@@ -1440,12 +1653,7 @@ def read_stars_over_time_from_csv() -> pd.DataFrame:
             "No raw star TS provided. Parse (previously resampled) stargazer time series CSV: %s",
             ARGS.stargazer_ts_resampled_outpath,
         )
-        df_resampled = pd.read_csv(  # type: ignore
-            ARGS.stargazer_ts_resampled_outpath,
-            index_col=["time_iso8601"],
-            date_parser=lambda col: pd.to_datetime(col, utc=True),
-        )
-        df_resampled.index.rename("time", inplace=True)
+        df_resampled = read_timeseries_csv(ARGS.stargazer_ts_resampled_outpath)
         log.info(
             "stars_cumulative, previously resampled: %s",
             df_resampled["stars_cumulative"],
@@ -1465,17 +1673,12 @@ def read_stars_over_time_from_csv() -> pd.DataFrame:
             ARGS.stargazer_ts_snapshot_inpath,
         )
 
-        df_snapshots_beyond40k = pd.read_csv(  # type: ignore
-            ARGS.stargazer_ts_snapshot_inpath,
-            index_col=["time_iso8601"],
-            date_parser=lambda col: pd.to_datetime(col, utc=True),
-        )
-        df_snapshots_beyond40k.index.rename("time", inplace=True)
+        df_snapshots_beyond40k = read_timeseries_csv(ARGS.stargazer_ts_snapshot_inpath)
 
         # Unsorted input is unlikely, but still.
-        df_snapshots_beyond40k.sort_index(inplace=True)
+        df_snapshots_beyond40k = _sort_by_index(df_snapshots_beyond40k)
 
-        log.info("stargazer snapshots timeseries:\n%s", df_snapshots_beyond40k)
+        log.debug("stargazer snapshots timeseries:\n%s", df_snapshots_beyond40k)
 
         # Defensive: select only those data points that are newer than those in
         # df_40klim.
@@ -1495,9 +1698,11 @@ def read_stars_over_time_from_csv() -> pd.DataFrame:
 
             # On purpose: overwrite object defined above.
             df_stargazers_complete = pd.concat(  # type: ignore
-                [df_stargazers_complete, df_snapshots_beyond40k]
+                [df_stargazers_complete, df_snapshots_beyond40k],
+                copy=False,
+                sort=False,
             )
-            log.info("concat result:\n%s", df_stargazers_complete)
+            log.debug("concat result:\n%s", df_stargazers_complete)
 
     # Make the stargazer timeseries that is going to be persisted via git
     # contain data from both, the raw timeseries (obtained from API) as well as
@@ -1529,7 +1734,7 @@ def read_stars_over_time_from_csv() -> pd.DataFrame:
             df_stargazers_complete, "stars_cumulative"
         )
 
-    log.info("df_stargazers_for_plot:\n%s", df_stargazers_for_plot)
+    log.debug("df_stargazers_for_plot:\n%s", df_stargazers_for_plot)
     return df_stargazers_for_plot
 
 
@@ -1540,15 +1745,8 @@ def read_forks_over_time_from_csv() -> pd.DataFrame:
 
     log.info("Parse fork time series (raw) CSV: %s", ARGS.fork_ts_inpath)
 
-    df = pd.read_csv(  # type: ignore
-        ARGS.fork_ts_inpath,
-        index_col=["time_iso8601"],
-        date_parser=lambda col: pd.to_datetime(col, utc=True),
-    )
-
-    # df = df.astype(int)
-    df.index.rename("time", inplace=True)
-    log.info("forks_cumulative, raw data: %s", df["forks_cumulative"])
+    df = read_timeseries_csv(ARGS.fork_ts_inpath)
+    log.debug("forks_cumulative, raw data:\n%s", df["forks_cumulative"])
 
     if not len(df):
         log.info("CSV file did not contain data, return empty df")
@@ -1559,7 +1757,7 @@ def read_forks_over_time_from_csv() -> pd.DataFrame:
         # cast to int. There are no NaNs to be expected, i.e. this should work
         # reliably.
         df_for_csv_file = resample_to_1d_resolution(df, "forks_cumulative").astype(int)
-        log.info("forks_cumulative, for CSV file (resampled): %s", df_for_csv_file)
+        log.debug("forks_cumulative, for CSV file (resampled):\n%s", df_for_csv_file)
         log.info("write aggregate to %s", ARGS.fork_ts_resampled_outpath)
         # Pragmatic strategy against partial write / encoding problems.
         tpath = ARGS.fork_ts_resampled_outpath + ".tmp"
@@ -1575,11 +1773,9 @@ def read_forks_over_time_from_csv() -> pd.DataFrame:
 
 def downsample_series_to_N_points(df, column):
     # Choose a bin time width for downsampling. Identify covered timespan
-    # first.
-
-    timespan_hours = int(
-        pd.Timedelta(df.index.values[-1] - df.index.values[0]).total_seconds() / 3600
-    )
+    # first (in full hours, via integer division of Timedelta objects -- this
+    # does not depend on the resolution of the index).
+    timespan_hours = (df.index[-1] - df.index[0]) // pd.Timedelta(hours=1)
     log.info(
         "timespan covererd, in hours (approximately): %s (%.1f days)",
         timespan_hours,
@@ -1719,14 +1915,16 @@ def parse_args():
         "--views-clones-aggregate-outpath",
         default="",
         metavar="PATH",
-        help="Write aggregate CSV file from discovered time series snapshots",
+        help="Write aggregate CSV file from discovered time series snapshots. "
+        "Write Parquet instead of CSV if PATH ends with .parquet",
     )
 
     parser.add_argument(
         "--views-clones-aggregate-inpath",
         default="",
         metavar="PATH",
-        help="Read aggregate CSV file in addition to regular time series snapshots discovery",
+        help="Read aggregate CSV file in addition to regular time series snapshots discovery. "
+        "Read Parquet instead of CSV if PATH ends with .parquet",
     )
 
     parser.add_argument(
@@ -1736,8 +1934,18 @@ def parse_args():
         help="Delete individual fragment CSV files after having written aggregate CSV file",
     )
 
+    parser.add_argument(
+        "--verbose",
+        default=False,
+        action="store_true",
+        help="Enable debug logging (e.g. log intermediate dataframes)",
+    )
+
     args = parser.parse_args()
 
+    if args.verbose:
+        log.setLevel(logging.DEBUG)
+
     if "/" not in args.repospec:
         sys.exit("missing slash in REPOSITORY spec")
 
@@ -1766,4 +1974,10 @@ def parse_args():
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except BaseException:
+        # E.g. `sys.exit(1)` after an error: do not leave the incomplete
+        # Markdown document behind.
+        discard_incomplete_md_report()
+        raise
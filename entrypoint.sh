@@ -127,7 +127,7 @@ cd "${STATS_REPOSPEC}"
 
 echo "operating in $(pwd)"
 
-mkdir -p newsnapshots
+mkdir -p newsnapshots ghrs-data
 echo "fetch.py for ${STATS_REPOSPEC}"
 
 # Have CPython emit its stderr data immediately to the attached streams to
@@ -137,14 +137,15 @@ echo "fetch.py for ${STATS_REPOSPEC}"
 export PYTHONUNBUFFERED="on"
 
 set +e
-# Note that the *-raw.csv files contain each star/fork event. These files do
-# for now not need to be in the repository (but it will make sense to store
-# them there once addressing the 10k star problem).
+# Note that the *-raw.csv files contain each star/fork event. These files are
+# stored in the repository so that fetch.py only needs to fetch star/fork
+# events newer than the newest one in these files (instead of fetching the
+# complete history during each invocation).
 set -x
 python "${GHRS_FILES_ROOT_PATH}/fetch.py" "${STATS_REPOSPEC}" \
     --snapshot-directory=newsnapshots \
-    --fork-ts-outpath=forks-raw.csv \
-    --stargazer-ts-outpath=stars-raw.csv \
+    --fork-ts-outpath=ghrs-data/forks-raw.csv \
+    --stargazer-ts-outpath=ghrs-data/stars-raw.csv \
     --stargazer-ts-snapshots-inoutpath=ghrs-data/stargazer-snapshots.csv
 FETCH_ECODE=$?
 set +x
@@ -174,6 +175,8 @@ git status --untracked=no --porcelain
 git add ghrs-data/snapshots
 
 git add ghrs-data/stargazer-snapshots.csv || echo "failed, ignore"
+git add ghrs-data/stars-raw.csv || echo "failed, ignore"
+git add ghrs-data/forks-raw.csv || echo "failed, ignore"
 
 # exit code 1 upon 'nothing to commit, working tree clean'
 git commit -m "ghrs: snap ${UPDATE_ID} for ${STATS_REPOSPEC}" || echo "commit failed, ignore (continue)"
@@ -189,9 +192,9 @@ python "${GHRS_FILES_ROOT_PATH}/analyze.py" \
     --resources-directory "${GHRS_FILES_ROOT_PATH}/resources" \
     --output-directory latest-report \
     --outfile-prefix "" \
-    --stargazer-ts-inpath "stars-raw.csv" \
+    --stargazer-ts-inpath "ghrs-data/stars-raw.csv" \
     --stargazer-ts-snapshot-inpath "ghrs-data/stargazer-snapshots.csv" \
-    --fork-ts-inpath "forks-raw.csv" \
+    --fork-ts-inpath "ghrs-data/forks-raw.csv" \
     --stargazer-ts-resampled-outpath "ghrs-data/stargazers.csv" \
     --fork-ts-resampled-outpath "ghrs-data/forks.csv" \
     --views-clones-aggregate-outpath "ghrs-data/views_clones_aggregate.csv" \
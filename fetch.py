@@ -17,17 +17,16 @@ import argparse
 import logging
 import os
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 
 import sys
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 import pandas as pd
 from github import Github, Repository  # type: ignore
 import requests
 import retrying  # type: ignore
-import pytz
 
 
 """
@@ -52,10 +51,14 @@ logging.basicConfig(
 
 
 # Get tz-aware datetime object corresponding to invocation time.
-# Note: could do `datetime.now(timezone.utc)` instead these days.
-NOW = pytz.timezone("UTC").localize(datetime.utcnow())
+NOW = datetime.now(timezone.utc)
 INVOCATION_TIME_STRING = NOW.strftime("%Y-%m-%d_%H%M%S")
 
+# Usually, a persisted stargazer/fork time series is only topped up with new
+# events (see `top_up_event_ts()`). On this day of the week (UTC; Monday is 0)
+# refetch the complete time series instead.
+EVENT_TS_FULL_REFETCH_WEEKDAY = 6
+
 if not os.environ.get("GHRS_GITHUB_API_TOKEN", None):
     sys.exit("error: environment variable GHRS_GITHUB_API_TOKEN empty or not set")
 
@@ -155,12 +158,13 @@ def fetch_and_write_stargazer_ts(repo: Repository.Repository, args):
 
     if os.path.exists(args.stargazer_ts_snapshots_inoutpath):
         log.info("read %s", args.stargazer_ts_snapshots_inoutpath)
-        sdf = pd.read_csv(  # type: ignore
-            args.stargazer_ts_snapshots_inoutpath,
-            index_col=["time_iso8601"],
-            date_parser=lambda col: pd.to_datetime(col, utc=True),
+        # Parse the timestamp column in one go, after reading (instead of via
+        # the deprecated `date_parser` callback).
+        sdf = pd.read_csv(args.stargazer_ts_snapshots_inoutpath, engine="pyarrow")
+        sdf.index = pd.DatetimeIndex(
+            pd.to_datetime(sdf.pop("time_iso8601"), utc=True, format="ISO8601"),
+            name="time",
         )
-        sdf.index.rename("time", inplace=True)
         log.info(
             "stargazers_cumulative_snapshot, raw data from %s:\n%s",
             args.stargazer_ts_snapshots_inoutpath,
@@ -209,7 +213,20 @@ def fetch_and_write_stargazer_ts(repo: Repository.Repository, args):
             args.stargazer_ts_outpath,
         )
 
-    dfstarscsv = get_stars_over_time_40k_limit(repo)
+    dfstarscsv = None
+    if may_top_up_event_ts(args.stargazer_ts_outpath):
+        # Stargazers are listed oldest first: iterate in reverse order.
+        dfstarscsv = top_up_event_ts(
+            args.stargazer_ts_outpath,
+            "stars_cumulative",
+            repo.get_stargazers_with_dates().reversed,
+            "starred_at",
+            current_stargazer_count,
+        )
+
+    if dfstarscsv is None:
+        dfstarscsv = get_stars_over_time_40k_limit(repo)
+
     log.info("stars_cumulative, for CSV file:\n%s", dfstarscsv)
     tpath = args.stargazer_ts_outpath + ".tmp"  # todo: rnd string
     log.info(
@@ -222,7 +239,28 @@ def fetch_and_write_stargazer_ts(repo: Repository.Repository, args):
 
 
 def fetch_and_write_fork_ts(repo: Repository.Repository, path: str):
-    dfforkcsv = get_forks_over_time(repo)
+    dfforkcsv = None
+    if may_top_up_event_ts(path):
+        # Forks are listed newest first (default sort order). The fork count in
+        # the repository properties may include forks that cannot be listed
+        # (e.g. private or deleted forks). Compare against the length of
+        # the listing instead (obtained with one request, for a page size of
+        # one), so that the top-up does not fail for that reason each time.
+        forks = repo.get_forks()
+        listed_fork_count = forks.totalCount
+        if listed_fork_count != repo.forks_count:
+            log.info(
+                "fork count: %s listed, %s in repository properties",
+                listed_fork_count,
+                repo.forks_count,
+            )
+        dfforkcsv = top_up_event_ts(
+            path, "forks_cumulative", forks, "created_at", listed_fork_count
+        )
+
+    if dfforkcsv is None:
+        dfforkcsv = get_forks_over_time(repo)
+
     log.info("forks_cumulative, for CSV file:\n%s", dfforkcsv)
     tpath = path + ".tmp"  # todo: rnd string
     log.info(
@@ -267,6 +305,76 @@ def fetch_all_traffic_api_endpoints(
     return df_views_clones, df_referrers_snapshot_now, df_paths_snapshot_now
 
 
+def may_top_up_event_ts(path: str) -> bool:
+    if not os.path.exists(path):
+        return False
+
+    if NOW.weekday() == EVENT_TS_FULL_REFETCH_WEEKDAY:
+        log.info("weekly full refetch, do not top up %s", path)
+        return False
+
+    return True
+
+
+def top_up_event_ts(
+    path: str, column: str, items_newest_first, time_attr: str, expected_count: int
+) -> Optional[pd.DataFrame]:
+    """
+    Update a stargazer or fork time series (one row per event) previously
+    written to the CSV file at `path`: only fetch the events that are newer
+    than the newest event in that file. `items_newest_first` is expected to be
+    a PaginatedList of stargazer or fork objects, newest first; stop
+    iterating (i.e. stop fetching pages) at the first item that is not newer.
+
+    Return `None` if the result does not contain `expected_count` events (e.g.
+    after stars were removed or forks were deleted). The complete time series
+    then needs to be fetched.
+
+    Limitation: removed events are not detected if they are offset by the
+    same number of new events (e.g. one unstar and one new star between two
+    invocations): the timestamp of the removed event then stays in the time
+    series. Also, a new event with precisely the same timestamp as the newest
+    known event is not picked up (which then results in a count mismatch).
+    That is why `may_top_up_event_ts()` enforces a periodic full refetch.
+    """
+    log.info("read %s", path)
+    df_prev = pd.read_csv(path)
+    dtidx_prev = pd.DatetimeIndex(
+        pd.to_datetime(df_prev["time_iso8601"], utc=True, format="ISO8601"),
+        name="time",
+    )
+    t_newest_known = dtidx_prev.max()
+    log.info("%s: newest event in %s: %s", column, path, t_newest_known)
+
+    # The datetime objects created by pygithub are naive ones (see
+    # `get_stars_over_time_40k_limit()`).
+    times_new = []
+    for item in items_newest_first:
+        t = getattr(item, time_attr)
+        if pd.Timestamp(t, tz="UTC") <= t_newest_known:
+            break
+        times_new.append(t)
+
+    log.info("%s: new events: %s", column, len(times_new))
+    dtidx = dtidx_prev
+    if times_new:
+        dtidx = dtidx.append(pd.to_datetime(times_new).tz_localize("UTC"))
+
+    if len(dtidx) != expected_count:
+        log.info(
+            "%s: %s events after top-up, expected %s: fetch complete time series",
+            column,
+            len(dtidx),
+            expected_count,
+        )
+        return None
+
+    dtidx = dtidx.sort_values()
+    df = pd.DataFrame(data={column: range(1, len(dtidx) + 1)}, index=dtidx)
+    df.index.name = "time"
+    return df
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Fetch traffic data for GitHub repository. Requires the "
@@ -422,9 +530,9 @@ def clones_or_views_to_df(items, metric) -> pd.DataFrame:
 
 
 def get_forks_over_time(repo: Repository.Repository) -> pd.DataFrame:
-    # TODO: for ~10k forks repositories, this operation is too costly for doing
-    # it as part of each analyzer invocation. Move this to the fetcher, and
-    # persist the data.
+    # Note: for ~10k forks repositories, this operation is too costly for doing
+    # it as part of each invocation. If the time series was persisted before,
+    # `top_up_event_ts()` is used instead.
     log.info("fetch fork time series for repo %s", repo)
 
     reqlimit_before = GHUB.get_rate_limit().core.remaining
@@ -445,22 +553,19 @@ def get_forks_over_time(repo: Repository.Repository) -> pd.DataFrame:
     # The GitHub API returns ISO 8601 timestamp strings encoding the timezone
     # via the Z suffix, i.e. Zulu time, i.e. UTC. pygithub doesn't parse that
     # timezone. That is, whereas the API returns `starred_at` in UTC, the
-    # datetime obj created by pygithub is a naive one. Correct for that.
-    forktimes_aware = [pytz.timezone("UTC").localize(f.created_at) for f in forks]
-
-    # Create sorted pandas DatetimeIndex
-    dtidx = pd.to_datetime(forktimes_aware)
+    # datetime obj created by pygithub is a naive one. Correct for that, for
+    # all timestamps at once (instead of localizing each datetime object).
+    # Create sorted pandas DatetimeIndex.
+    dtidx = pd.to_datetime([f.created_at for f in forks]).tz_localize("UTC")
     dtidx = dtidx.sort_values()
 
-    # Each timestamp corresponds to *1* fork event. Build cumulative sum over
-    # time.
+    # Each timestamp corresponds to *1* fork event. That is, the cumulative
+    # sum over time (index is sorted) is simply 1, 2, ..., N.
     df = pd.DataFrame(
-        data={"fork_events": [1] * len(forks)},
+        data={"forks_cumulative": range(1, len(forks) + 1)},
         index=dtidx,
     )
     df.index.name = "time"
-    df["forks_cumulative"] = df["fork_events"].cumsum()
-    df = df.drop(columns=["fork_events"]).astype(int)
     log.info("forks df: \n%s", df)
     return df
 
@@ -471,9 +576,9 @@ def get_stars_over_time_40k_limit(repo: Repository.Repository) -> pd.DataFrame:
     the oldest 40.000 stargazers (a GitHub HTTP API limitation, see
     https://github.com/jgehrcke/github-repo-stats/issues/76).
     """
-    # TODO: for ~10k stars repositories, this operation is too costly for doing
-    # it as part of each analyzer invocation. Move this to the fetcher, and
-    # persist the data.
+    # Note: for ~10k stars repositories, this operation is too costly for doing
+    # it as part of each invocation. If the time series was persisted before,
+    # `top_up_event_ts()` is used instead.
     log.info("fetch stargazer time series for repo %s", repo)
 
     reqlimit_before = GHUB.get_rate_limit().core.remaining
@@ -482,8 +587,6 @@ def get_stars_over_time_40k_limit(repo: Repository.Repository) -> pd.DataFrame:
 
     gazers = []
 
-    # TODO for addressing the 10ks challenge: save state to disk, and refresh
-    # using reverse order iteration. See for repo in user.get_repos().reversed
     for count, gazer in enumerate(repo.get_stargazers_with_dates(), 1):
         # Store `PullRequest` object with integer key in dictionary.
         gazers.append(gazer)
@@ -498,38 +601,35 @@ def get_stars_over_time_40k_limit(repo: Repository.Repository) -> pd.DataFrame:
     # The GitHub API returns ISO 8601 timestamp strings encoding the timezone
     # via the Z suffix, i.e. Zulu time, i.e. UTC. pygithub doesn't parze that
     # timezone. That is, whereas the API returns `starred_at` in UTC, the
-    # datetime obj created by pygithub is a naive one. Correct for that.
-    startimes_aware = [pytz.timezone("UTC").localize(g.starred_at) for g in gazers]
+    # datetime obj created by pygithub is a naive one. Correct for that (below,
+    # for all timestamps at once instead of localizing each datetime object).
 
     # Work towards a dataframe of the following shape:
-    #                            star_events  stars_cumulative
+    #                            stars_cumulative
     # time
-    # 2020-11-26 16:25:37+00:00            1                 1
-    # 2020-11-26 16:27:23+00:00            1                 2
-    # 2020-11-26 16:30:05+00:00            1                 3
-    # 2020-11-26 17:31:57+00:00            1                 4
-    # 2020-11-26 17:48:48+00:00            1                 5
-    # ...                                ...               ...
-    # 2020-12-19 19:48:58+00:00            1               327
-    # 2020-12-22 04:44:35+00:00            1               328
-    # 2020-12-22 19:00:42+00:00            1               329
-    # 2020-12-25 05:01:42+00:00            1               330
-    # 2020-12-28 01:07:55+00:00            1               331
+    # 2020-11-26 16:25:37+00:00                 1
+    # 2020-11-26 16:27:23+00:00                 2
+    # 2020-11-26 16:30:05+00:00                 3
+    # 2020-11-26 17:31:57+00:00                 4
+    # 2020-11-26 17:48:48+00:00                 5
+    # ...                                     ...
+    # 2020-12-19 19:48:58+00:00               327
+    # 2020-12-22 04:44:35+00:00               328
+    # 2020-12-22 19:00:42+00:00               329
+    # 2020-12-25 05:01:42+00:00               330
+    # 2020-12-28 01:07:55+00:00               331
 
     # Create sorted pandas DatetimeIndex
-    dtidx = pd.to_datetime(startimes_aware)
+    dtidx = pd.to_datetime([g.starred_at for g in gazers]).tz_localize("UTC")
     dtidx = dtidx.sort_values()
 
-    # Each timestamp corresponds to *1* star event. Build cumulative sum over
-    # time.
+    # Each timestamp corresponds to *1* star event. That is, the cumulative
+    # sum over time (index is sorted) is simply 1, 2, ..., N.
     df = pd.DataFrame(
-        data={"star_events": [1] * len(gazers)},
+        data={"stars_cumulative": range(1, len(gazers) + 1)},
         index=dtidx,
     )
     df.index.name = "time"
-
-    df["stars_cumulative"] = df["star_events"].cumsum()
-    df = df.drop(columns=["star_events"]).astype(int)
     log.info("stargazer df\n %s", df)
     return df
 
@@ -0,0 +1,142 @@
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+# fetch.py requires this to be set upon import (it does not use the token
+# before `main()` is called).
+os.environ.setdefault("GHRS_GITHUB_API_TOKEN", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import fetch  # noqa: E402
+
+
+KNOWN_TIMES = [
+    datetime(2020, 11, 26, 16, 25, 37),
+    datetime(2020, 11, 27, 9, 0, 0),
+    datetime(2020, 12, 1, 12, 30, 0),
+]
+
+
+def _gazers_newest_first(times):
+    # Like pygithub's stargazer objects: naive datetimes (in UTC).
+    return [SimpleNamespace(starred_at=t) for t in sorted(times, reverse=True)]
+
+
+@pytest.fixture
+def persisted_path(tmp_path):
+    # Write the CSV file like `fetch_and_write_stargazer_ts()` does.
+    dtidx = pd.to_datetime(KNOWN_TIMES).tz_localize("UTC")
+    df = pd.DataFrame(
+        data={"stars_cumulative": range(1, len(dtidx) + 1)},
+        index=pd.DatetimeIndex(dtidx, name="time"),
+    )
+    path = str(tmp_path / "stars-raw.csv")
+    df.to_csv(path, index_label="time_iso8601")
+    return path
+
+
+def _top_up(path, times, expected_count):
+    return fetch.top_up_event_ts(
+        path,
+        "stars_cumulative",
+        _gazers_newest_first(times),
+        "starred_at",
+        expected_count,
+    )
+
+
+def test_top_up_no_new_events(persisted_path):
+    df = _top_up(persisted_path, KNOWN_TIMES, 3)
+    assert list(df.index) == list(pd.to_datetime(KNOWN_TIMES).tz_localize("UTC"))
+    assert list(df["stars_cumulative"]) == [1, 2, 3]
+
+
+def test_top_up_new_events(persisted_path):
+    new_times = [datetime(2020, 12, 2, 8, 0, 0), datetime(2020, 12, 5, 23, 59, 59)]
+    df = _top_up(persisted_path, KNOWN_TIMES + new_times, 5)
+    expected_times = pd.to_datetime(KNOWN_TIMES + new_times).tz_localize("UTC")
+    assert list(df.index) == list(expected_times)
+    assert df.index.name == "time"
+    assert list(df["stars_cumulative"]) == [1, 2, 3, 4, 5]
+
+
+def test_top_up_stops_at_newest_known_event(persisted_path):
+    # Items not newer than the newest known event must not be consumed beyond
+    # the first one (i.e. no more pages are fetched).
+    consumed = []
+
+    def items_newest_first():
+        for t in [datetime(2020, 12, 3), KNOWN_TIMES[-1], KNOWN_TIMES[-2]]:
+            consumed.append(t)
+            yield SimpleNamespace(starred_at=t)
+
+    df = fetch.top_up_event_ts(
+        persisted_path, "stars_cumulative", items_newest_first(), "starred_at", 4
+    )
+    assert list(df["stars_cumulative"]) == [1, 2, 3, 4]
+    assert consumed == [datetime(2020, 12, 3), KNOWN_TIMES[-1]]
+
+
+def test_top_up_new_event_at_newest_known_timestamp(persisted_path):
+    # A new star with the same timestamp as the newest known one is not
+    # picked up: the count does not match, require a full refetch.
+    times = KNOWN_TIMES + [KNOWN_TIMES[-1]]
+    assert _top_up(persisted_path, times, 4) is None
+
+
+def test_top_up_count_mismatch(persisted_path):
+    # E.g. a star was removed: the persisted time series contains more events
+    # than expected.
+    new_times = [datetime(2020, 12, 2, 8, 0, 0)]
+    assert _top_up(persisted_path, KNOWN_TIMES + new_times, 3) is None
+
+
+def test_may_top_up_event_ts(persisted_path, tmp_path, monkeypatch):
+    assert not fetch.may_top_up_event_ts(str(tmp_path / "does-not-exist.csv"))
+
+    # 2020-12-06 is a Sunday, 2020-12-07 is a Monday.
+    monkeypatch.setattr(fetch, "EVENT_TS_FULL_REFETCH_WEEKDAY", 6)
+    monkeypatch.setattr(fetch, "NOW", datetime(2020, 12, 6, 12, 0, 0))
+    assert not fetch.may_top_up_event_ts(persisted_path)
+    monkeypatch.setattr(fetch, "NOW", datetime(2020, 12, 7, 12, 0, 0))
+    assert fetch.may_top_up_event_ts(persisted_path)
+
+
+class _FakeForkList(list):
+    # Like pygithub's PaginatedList: iterable, and with a `totalCount` prop.
+    @property
+    def totalCount(self):
+        return len(self)
+
+
+def test_fork_top_up_compares_against_listing(tmp_path, monkeypatch):
+    path = str(tmp_path / "forks-raw.csv")
+    dtidx = pd.to_datetime(KNOWN_TIMES).tz_localize("UTC")
+    pd.DataFrame(
+        data={"forks_cumulative": range(1, len(dtidx) + 1)},
+        index=pd.DatetimeIndex(dtidx, name="time"),
+    ).to_csv(path, index_label="time_iso8601")
+
+    new_time = datetime(2020, 12, 2, 8, 0, 0)
+    forks = _FakeForkList(
+        SimpleNamespace(created_at=t)
+        for t in sorted(KNOWN_TIMES + [new_time], reverse=True)
+    )
+    # One fork more in the repository properties than can be listed: this
+    # must not trigger fetching the complete time series.
+    repo = SimpleNamespace(get_forks=lambda: forks, forks_count=len(forks) + 1)
+
+    def fail(repo):
+        raise AssertionError("unexpected full refetch")
+
+    monkeypatch.setattr(fetch, "get_forks_over_time", fail)
+    # 2020-12-07 is a Monday (no weekly full refetch).
+    monkeypatch.setattr(fetch, "NOW", datetime(2020, 12, 7, 12, 0, 0))
+    fetch.fetch_and_write_fork_ts(repo, path)
+
+    df = pd.read_csv(path)
+    assert list(df["forks_cumulative"]) == [1, 2, 3, 4]